@@ -0,0 +1,55 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    # csv.writer escreve aqui e recebe a linha pronta de volta
+    def write(self, value):
+        return value
+
+
+def stream_csv(fields, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(["" if value is None else value for value in row])
+
+
+def stream_ndjson(fields, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def get_export_format(request):
+    """
+    Returns the format asked in the output query param, csv by default,
+    or None if it is not supported.
+    """
+    export_format = request.query_params.get("output", "csv")
+    return export_format if export_format in EXPORT_FORMATS else None
+
+
+def export_response(queryset, columns, export_format, filename):
+    """
+    Streams a queryset as CSV or newline delimited JSON, with one column for each
+    item of columns, a dict from the column name to the field or annotation read.
+    Rows are read with iterator(), in chunks, so memory stays flat whatever the
+    size of the table; on PostgreSQL it uses a server-side cursor.
+    """
+    rows = queryset.values_list(*columns.values()).iterator(chunk_size=CHUNK_SIZE)
+    stream = stream_csv if export_format == "csv" else stream_ndjson
+    response = StreamingHttpResponse(
+        stream(list(columns), rows), content_type=EXPORT_FORMATS[export_format]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+    return response
@@ -0,0 +1,107 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination in creation order: the cursor holds the (created_at, id) pair of
+    the row where the page stopped and the next page starts right after it, so a deep
+    page costs the same as the first, even among rows created at the same instant.
+    DRF's CursorPagination keys its cursor on created_at only and skips the rows that
+    share it with an OFFSET, which is why the page is filtered here on both fields.
+    The models paginated with it are indexed on (created_at, id).
+    """
+
+    ordering = ("created_at", "id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            created_at, pk = instance["created_at"], instance["id"]
+        else:
+            created_at, pk = instance.created_at, instance.pk
+        return f"{created_at.isoformat()}|{pk}"
+
+    def filter_from_position(self, queryset, position, reverse):
+        """
+        Keeps the rows after the given position, or before it on a reverse cursor.
+        The created_at range comes first so the database scans the index from there.
+        """
+        created_at, _, pk = position.partition("|")
+        try:
+            created_at = parse_datetime(created_at)
+            pk = queryset.model._meta.pk.to_python(pk)
+        except (ValueError, ValidationError):
+            created_at = None
+        if created_at is None or pk is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        if reverse:
+            return queryset.filter(created_at__lte=created_at).filter(
+                Q(created_at__lt=created_at) | Q(pk__lt=pk)
+            )
+        return queryset.filter(created_at__gte=created_at).filter(
+            Q(created_at__gt=created_at) | Q(pk__gt=pk)
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        current_position = None if self.cursor is None else self.cursor.position
+
+        if reverse:
+            queryset = queryset.order_by(*[f"-{field}" for field in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            queryset = self.filter_from_position(queryset, current_position, reverse)
+
+        # uma linha a mais diz se há outra página nessa direção
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_following_position = len(results) > len(self.page)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+        self.next_position = self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # a posição de cada linha é única: a próxima página começa depois da última
+        position = (
+            self._get_position_from_instance(self.page[-1], self.ordering)
+            if self.page
+            else self.next_position
+        )
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = (
+            self._get_position_from_instance(self.page[0], self.ordering)
+            if self.page
+            else self.previous_position
+        )
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
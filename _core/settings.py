@@ -45,7 +45,7 @@ DJANGO_APPS = [
 
 THIRD_PARTY_APPS = ["rest_framework", "drf_spectacular", "corsheaders"]
 
-MY_APPS = ["users", "pets", "reservations", "reviews", "rooms", "services"]
+MY_APPS = ["users", "pets", "reservations", "reviews", "rooms", "services", "reports"]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + MY_APPS
 
@@ -58,7 +58,6 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "reservations.middleware.UpdateReservationStatusMiddleware",
 ]
 
 ROOT_URLCONF = "_core.urls"
@@ -113,6 +112,19 @@ SPECTACULAR_SETTINGS = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# Locmem is per process; for several workers use the file cache instead:
+# "django.core.cache.backends.filebased.FileBasedCache" with LOCATION set to a shared directory
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "me-au",
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -29,6 +29,7 @@ urlpatterns = [
     path("api/", include("rooms.urls")),
     path("api/", include("services.urls")),
     path("api/", include("reservations.urls")),
+    path("api/", include("reports.urls")),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
         "api/docs/swagger-ui/",
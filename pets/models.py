@@ -16,6 +16,13 @@ class Pet(models.Model):
     vaccinated = models.BooleanField()
     docile = models.BooleanField()
     user = models.ForeignKey("users.User", on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="pet_created_idx"),
+            models.Index(fields=["user", "created_at", "id"], name="pet_user_created_idx"),
+        ]
 
 
 #    def __repr__(self) -> str:
@@ -5,11 +5,13 @@ from .serializers import PetSerializer
 from rest_framework.permissions import IsAuthenticated
 from .permissions import IsAdminOrPetOwner
 from rest_framework.views import Response, status
+from _core.pagination import CreatedAtCursorPagination
 
 
 class PetView(ListCreateAPIView):
     queryset = Pet.objects.all()
     serializer_class = PetSerializer
+    pagination_class = CreatedAtCursorPagination
 
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -0,0 +1,50 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalyticsJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start", models.DateField()),
+                ("end", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=7,
+                    ),
+                ),
+                ("report", models.JSONField(null=True)),
+                ("error", models.TextField(null=True)),
+                ("updated_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="analyticsjob",
+            constraint=models.UniqueConstraint(
+                fields=("start", "end"), name="unique_analytics_window"
+            ),
+        ),
+    ]
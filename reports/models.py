@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class AnalyticsJobStatusChoices(models.Choices):
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class AnalyticsJob(models.Model):
+    # relatório de analytics de uma janela, gerado em background; fica no banco para
+    # que qualquer processo veja o andamento e o resultado
+    start = models.DateField()
+    end = models.DateField()
+    status = models.CharField(
+        max_length=7, choices=AnalyticsJobStatusChoices.choices, default="pending"
+    )
+    report = models.JSONField(null=True)
+    error = models.TextField(null=True)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["start", "end"], name="unique_analytics_window")
+        ]
+
+    def __repr__(self) -> str:
+        return f"AnalyticsJob [{self.start} - {self.end}]: {self.status}"
@@ -0,0 +1,7 @@
+from rooms.serializers import CalendarWindowSerializer
+
+MAX_ANALYTICS_MONTHS = 120
+
+
+class AnalyticsWindowSerializer(CalendarWindowSerializer):
+    max_months = MAX_ANALYTICS_MONTHS
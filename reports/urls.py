@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("reports/occupancy/", views.OccupancyReportView.as_view()),
+    path("reports/analytics/", views.AnalyticsReportView.as_view()),
+]
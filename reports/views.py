@@ -0,0 +1,44 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView, Response, status
+from reservations.aux_functions.analytics import get_analytics_report
+from rooms.aux_functions.report import get_occupancy_report
+from rooms.permissions import IsAdm
+from rooms.serializers import CalendarWindowSerializer
+from .serializers import AnalyticsWindowSerializer
+
+
+class OccupancyReportView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdm]
+
+    def get(self, request):
+        window = CalendarWindowSerializer(data=request.query_params)
+        window.is_valid(raise_exception=True)
+
+        report = get_occupancy_report(
+            window.validated_data["from"], window.validated_data["to"]
+        )
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class AnalyticsReportView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdm]
+
+    def get(self, request):
+        window = AnalyticsWindowSerializer(data=request.query_params)
+        window.is_valid(raise_exception=True)
+
+        job_status, report = get_analytics_report(
+            window.validated_data["from"], window.validated_data["to"]
+        )
+        # janelas grandes são geradas em background: o cliente repete a requisição
+        if job_status == "pending":
+            return Response({"status": "pending"}, status=status.HTTP_202_ACCEPTED)
+        if job_status == "failed":
+            return Response(
+                {"status": "failed", "detail": "Report generation failed, try again later"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        return Response(report, status=status.HTTP_200_OK)
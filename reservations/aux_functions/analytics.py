@@ -0,0 +1,206 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from _core.export import CHUNK_SIZE
+from reports.models import AnalyticsJob
+from reservations.models import Reservation, ReservationPet, ReservationService
+from rooms.aux_functions.dates import get_months_in_range
+
+ANALYTICS_COLUMNS = ["checkin", "checkout", "created_at", "status", "total", "pets", "services"]
+# janelas com mais meses que isso são geradas em background
+MAX_REQUEST_MONTHS = 12
+CACHE_TIMEOUT = 60 * 60
+PENDING_TIMEOUT = 60 * 10
+
+logger = logging.getLogger(__name__)
+
+# um único worker por processo: relatórios grandes rodam um de cada vez, fora da
+# thread da requisição; o andamento fica no AnalyticsJob, visível a todos os processos
+analytics_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analytics")
+
+
+def count_lines(model):
+    lines = (
+        model.objects.filter(reservation=OuterRef("pk"))
+        .order_by()
+        .values("reservation")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return Coalesce(Subquery(lines), 0)
+
+
+def get_analytics_frame(start, end):
+    """
+    Loads the reservations with checkin between start (inclusive) and end (exclusive)
+    into a DataFrame, one row per reservation with its stored total and the number of
+    pets and services booked. Pets and services are counted in subqueries, so it is a
+    single values_list query read in chunks.
+    """
+    rows = (
+        Reservation.objects.filter(checkin__gte=start, checkin__lt=end)
+        .annotate(pets=count_lines(ReservationPet), services=count_lines(ReservationService))
+        .values_list(*ANALYTICS_COLUMNS)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    frame = pd.DataFrame.from_records(rows, columns=ANALYTICS_COLUMNS)
+
+    frame["checkin"] = pd.to_datetime(frame["checkin"])
+    frame["checkout"] = pd.to_datetime(frame["checkout"])
+    frame["created_at"] = (
+        pd.to_datetime(frame["created_at"], utc=True)
+        .dt.tz_convert(settings.TIME_ZONE)
+        .dt.tz_localize(None)
+        .dt.normalize()
+    )
+    # reservas anteriores ao preço gravado não têm total
+    frame["total"] = pd.to_numeric(frame["total"].astype(object).fillna(0)).astype(float)
+    frame["pets"] = frame["pets"].astype(int)
+    frame["services"] = frame["services"].astype(int)
+    return frame
+
+
+def get_rounded(value, digits=2):
+    return None if pd.isna(value) else round(float(value), digits)
+
+
+def build_analytics_report(start, end):
+    """
+    Revenue and demand metrics of the reservations with checkin between start
+    (inclusive) and end (exclusive), aggregated over the DataFrame without looping
+    over the reservations:
+    - revenue, stays and pet nights of each month, by checkin, cancelled excluded;
+    - average length of stay, in nights, cancelled excluded;
+    - average and median lead time, the days between booking and checkin;
+    - service attach rate, the share of stays with at least one service;
+    - cancellation rate, the share of reservations cancelled.
+    """
+    frame = get_analytics_frame(start, end)
+    cancelled = frame["status"] == "cancelled"
+    stays = frame[~cancelled]
+    nights = (stays["checkout"] - stays["checkin"]).dt.days
+    # reservas importadas do histórico são criadas depois do checkin
+    lead_time = (frame["checkin"] - frame["created_at"]).dt.days
+    lead_time = lead_time[lead_time >= 0]
+
+    months = pd.period_range(start, end - timedelta(1), freq="M")
+    by_month = (
+        stays.assign(pet_nights=nights * stays["pets"])
+        .groupby(stays["checkin"].dt.to_period("M"))
+        .agg(
+            reservations=("total", "size"),
+            revenue=("total", "sum"),
+            pet_nights=("pet_nights", "sum"),
+        )
+        .reindex(months, fill_value=0)
+    )
+
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "reservations": len(frame),
+        "revenue": f"{stays['total'].sum():.2f}",
+        "average_length_of_stay": get_rounded(nights.mean()),
+        "average_lead_time": get_rounded(lead_time.mean()),
+        "median_lead_time": get_rounded(lead_time.median()),
+        "service_attach_rate": get_rounded((stays["services"] > 0).mean(), 4),
+        "cancellation_rate": get_rounded(cancelled.mean(), 4),
+        "months": [
+            {
+                "month": str(month),
+                "reservations": int(row.reservations),
+                "pet_nights": int(row.pet_nights),
+                "revenue": f"{row.revenue:.2f}",
+            }
+            for month, row in by_month.iterrows()
+        ],
+    }
+
+
+def get_cache_key(start, end):
+    return f"analytics:{start.isoformat()}:{end.isoformat()}"
+
+
+def run_analytics_job(job_id):
+    """
+    Builds the report of an AnalyticsJob and stores it in the job, or marks the job as
+    failed, logging the error, so the polls stop starting it again.
+    """
+    job = AnalyticsJob.objects.get(id=job_id)
+    try:
+        report = build_analytics_report(job.start, job.end)
+    except Exception as error:
+        logger.exception("Analytics report from %s to %s failed", job.start, job.end)
+        AnalyticsJob.objects.filter(id=job_id).update(
+            status="failed", error=repr(error), updated_at=timezone.now()
+        )
+        return
+    AnalyticsJob.objects.filter(id=job_id).update(
+        status="done", report=report, error=None, updated_at=timezone.now()
+    )
+
+
+def run_analytics_job_in_background(job_id):
+    try:
+        run_analytics_job(job_id)
+    finally:
+        # a thread do worker abre a própria conexão com o banco
+        connection.close()
+
+
+def start_analytics_job(start, end):
+    """
+    Returns the AnalyticsJob of the window, sending it to the background worker when
+    there is no job yet, when its report is older than CACHE_TIMEOUT or when it failed
+    or stayed pending for PENDING_TIMEOUT, as if the process running it had died.
+    The job lives in the database, so every process sees the same job: creating it
+    and restarting it are conditional writes, and only the process that wins starts
+    the worker.
+    """
+    now = timezone.now()
+    job = AnalyticsJob.objects.filter(start=start, end=end).first()
+    if job is None:
+        try:
+            with transaction.atomic():
+                job = AnalyticsJob.objects.create(start=start, end=end, updated_at=now)
+        except IntegrityError:
+            # outro processo criou o job ao mesmo tempo
+            return AnalyticsJob.objects.get(start=start, end=end)
+    else:
+        timeout = CACHE_TIMEOUT if job.status == "done" else PENDING_TIMEOUT
+        if now - job.updated_at < timedelta(seconds=timeout):
+            return job
+        restarted = AnalyticsJob.objects.filter(
+            id=job.id, updated_at=job.updated_at
+        ).update(status="pending", report=None, error=None, updated_at=now)
+        if not restarted:
+            return AnalyticsJob.objects.get(id=job.id)
+        job.refresh_from_db()
+
+    analytics_executor.submit(run_analytics_job_in_background, job.id)
+    return job
+
+
+def get_analytics_report(start, end):
+    """
+    Returns the analytics report of the window as a (status, report) pair. Windows of
+    up to MAX_REQUEST_MONTHS months are built in the request and cached; larger ones
+    are built by the background worker through an AnalyticsJob, and the report is None
+    until the job is done.
+    """
+    if len(get_months_in_range(start, end)) > MAX_REQUEST_MONTHS:
+        job = start_analytics_job(start, end)
+        return job.status, job.report
+
+    report = cache.get(get_cache_key(start, end))
+    if report is None:
+        report = build_analytics_report(start, end)
+        cache.set(get_cache_key(start, end), report, CACHE_TIMEOUT)
+    return "done", report
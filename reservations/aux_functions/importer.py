@@ -0,0 +1,701 @@
+import csv
+import json
+import uuid
+from bisect import bisect_left, insort
+from datetime import date, datetime
+from itertools import groupby, islice
+from time import perf_counter
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import DatabaseError, transaction
+from pets.models import Pet, typeOptions
+from reservations.models import Reservation, ReservationPet, ReservationStatusChoices
+from reservations.serializers import ReservationSerializer
+from rooms.models import Room
+from rooms.aux_functions.availability import RoomUnavailable
+from rooms.aux_functions.dates import has_next_month
+from rooms.aux_functions.locks import lock_room_types
+from rooms.aux_functions.occupancy import occupy_stays
+from rooms.aux_functions.registry import accepts_pet_type, is_shared, room_type_registry
+from rooms.serializers import MAX_SEARCH_NIGHTS
+from rooms.signals import invalidate_stays
+from users.models import User
+from .pricing import get_room_prices, price_reservation
+from .validation import is_any_pet_booked
+
+TRUE_VALUES = {"true", "1", "yes", "sim"}
+FALSE_VALUES = {"false", "0", "no", "não", "nao"}
+
+
+class ImportRecord:
+    """
+    One user, pet or reservation of an input file, with the lines it came from.
+    A reservation with several pets spans one line per pet.
+    """
+
+    def __init__(self, lines, rows):
+        self.lines = lines
+        self.rows = rows
+        self.errors = []
+
+
+class ImportResult:
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.seconds = 0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0
+
+
+class RejectsFile:
+    """
+    JSON lines file with every rejected record, its lines, its rows and its errors.
+    Created on the first rejection.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+
+    def write(self, source, record):
+        if self._file is None:
+            self._file = open(self.path, "w", encoding="utf-8")
+        line = {
+            "file": source,
+            "lines": record.lines,
+            "errors": record.errors,
+            "rows": record.rows,
+        }
+        self._file.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def read_rows(path):
+    """
+    Streams the rows of a .csv or .jsonl file as (line, row) pairs, one line at a time.
+    Lines of a .jsonl file that are not valid JSON objects come with row None.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        if path.endswith(".csv"):
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line, text in enumerate(file, 1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError:
+                row = None
+            yield line, row if isinstance(row, dict) else None
+
+
+def read_records(path, key=None):
+    """
+    Groups the rows of a file into records. Consecutive rows with the same value in the
+    key column are one record, rows without it are a record each.
+    """
+    def get_group(item):
+        line, row = item
+        if key and row and row.get(key):
+            return ("key", row[key])
+        return ("line", line)
+
+    for _, items in groupby(read_rows(path), key=get_group):
+        items = list(items)
+        yield ImportRecord([line for line, _ in items], [row for _, row in items])
+
+
+def iter_batches(records, batch_size):
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def parse_bool(value, default=None):
+    if value is None or value == "":
+        if default is None:
+            raise ValueError("is required")
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"invalid boolean '{value}'")
+
+
+def parse_uuid(value):
+    if value is None or value == "":
+        return None
+    return uuid.UUID(str(value))
+
+
+def parse_date(value):
+    return date.fromisoformat(str(value))
+
+
+def parse_text(record, row, field, max_length, required=False):
+    """
+    Returns the value of a text column, or None when it is empty or invalid, in which
+    case the problem goes to record.errors. Numbers are taken as text, as in a .csv;
+    other JSON values, like lists and objects, are rejected. Values longer than the
+    max_length of the model field are rejected before they reach the database.
+    """
+    value = row.get(field)
+    if value is None or value == "":
+        if required:
+            record.errors.append(f"{field} is required")
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    if not isinstance(value, str):
+        record.errors.append(f"{field} must be text")
+        return None
+    if max_length is not None and len(value) > max_length:
+        record.errors.append(f"{field} is too long")
+        return None
+    return value
+
+
+def get_max_length(model, field):
+    return model._meta.get_field(field).max_length
+
+
+def get_password_hash(password):
+    """
+    Hashes coming from the partner system are kept, so the import does not run one
+    PBKDF2 per user; users without a password get an unusable one and can reset it.
+    """
+    if not password:
+        return make_password(None)
+    try:
+        identify_hasher(password)
+    except ValueError:
+        return make_password(password)
+    return password
+
+
+class BatchImporter:
+    """
+    Streams a file in batches of records. Each batch is validated in memory, with
+    one query per referenced model, and its valid records are written with bulk_create
+    in one transaction. If the database still refuses the batch, its records are
+    written one by one so only the failing ones are rejected.
+    """
+
+    # coluna que junta várias linhas num mesmo registro
+    key = None
+
+    def __init__(self, rejects, batch_size=1000):
+        self.rejects = rejects
+        self.batch_size = batch_size
+
+    def run(self, path):
+        result = ImportResult(path)
+        start = perf_counter()
+        for batch in iter_batches(read_records(path, self.key), self.batch_size):
+            for record in batch:
+                result.rows += len(record.lines)
+                if None in record.rows:
+                    record.errors.append("Invalid JSON object")
+
+            self.validate([record for record in batch if not record.errors])
+            self.write_batch([record for record in batch if not record.errors])
+
+            for record in batch:
+                if record.errors:
+                    self.rejects.write(path, record)
+                    result.rejected += 1
+                else:
+                    result.imported += 1
+        self.finish()
+        result.seconds = perf_counter() - start
+        return result
+
+    def validate(self, records):
+        raise NotImplementedError
+
+    def insert(self, records):
+        raise NotImplementedError
+
+    def write_batch(self, records):
+        if not records:
+            return
+        try:
+            with transaction.atomic():
+                self.insert(records)
+            return
+        except DatabaseError:
+            pass
+
+        # valores que o banco recusa, como um texto longo demais, rejeitam só o registro
+        for record in records:
+            try:
+                with transaction.atomic():
+                    self.insert([record])
+            except DatabaseError as error:
+                record.errors.append(str(error))
+
+    def finish(self):
+        pass
+
+
+class UserImporter(BatchImporter):
+    """
+    Columns: name, email, password, is_adm, cpf, profile_img and, optionally, id.
+    The password may be a Django password hash, a plain password or empty.
+    """
+
+    def validate(self, records):
+        emails = {}
+        for record in records:
+            row = record.rows[0]
+            record.user = None
+            email = User.objects.normalize_email(
+                parse_text(record, row, "email", get_max_length(User, "email")) or ""
+            )
+            try:
+                validate_email(email)
+            except ValidationError:
+                record.errors.append("Invalid email")
+            if email in emails:
+                record.errors.append("Duplicate email in the file")
+            emails.setdefault(email, record)
+            name = parse_text(record, row, "name", get_max_length(User, "name"), True)
+            cpf = parse_text(record, row, "cpf", get_max_length(User, "cpf"))
+            profile_img = parse_text(
+                record, row, "profile_img", get_max_length(User, "profile_img")
+            )
+            # senhas em texto puro viram hash, o tamanho só importa para os hashes
+            password = parse_text(record, row, "password", None)
+            try:
+                is_adm = parse_bool(row.get("is_adm"), default=False)
+            except ValueError as error:
+                record.errors.append(f"is_adm: {error}")
+            try:
+                user_id = parse_uuid(row.get("id"))
+            except ValueError:
+                record.errors.append("Invalid id")
+            if record.errors:
+                continue
+
+            record.user = User(
+                id=user_id or uuid.uuid4(),
+                name=name,
+                email=email,
+                is_adm=is_adm,
+                is_superuser=is_adm,
+                cpf=cpf,
+                profile_img=profile_img,
+                password=get_password_hash(password),
+            )
+
+        # uma consulta para todos os emails do lote
+        existing = set(
+            User.objects.filter(email__in=list(emails)).values_list("email", flat=True)
+        )
+        for email in existing:
+            emails[email].errors.append("This email is already registered")
+
+    def insert(self, records):
+        User.objects.bulk_create([record.user for record in records])
+
+
+class PetImporter(BatchImporter):
+    """
+    Columns: user_email, name, type, age, neutered, vaccinated, docile and, optionally, id.
+    """
+
+    def validate(self, records):
+        emails = set()
+        for record in records:
+            row = record.rows[0]
+            record.pet = None
+            user_email = parse_text(
+                record, row, "user_email", get_max_length(User, "email"), True
+            )
+            name = parse_text(record, row, "name", get_max_length(Pet, "name"), True)
+            age = parse_text(record, row, "age", get_max_length(Pet, "age"), True)
+            if row.get("type") not in typeOptions.values:
+                record.errors.append(f"type must be one of {', '.join(typeOptions.values)}")
+            flags = {}
+            for field in ["neutered", "vaccinated", "docile"]:
+                try:
+                    flags[field] = parse_bool(row.get(field))
+                except ValueError as error:
+                    record.errors.append(f"{field}: {error}")
+            try:
+                pet_id = parse_uuid(row.get("id"))
+            except ValueError:
+                record.errors.append("Invalid id")
+            if record.errors:
+                continue
+
+            email = User.objects.normalize_email(user_email)
+            emails.add(email)
+            record.pet = Pet(
+                id=pet_id or uuid.uuid4(),
+                name=name,
+                type=row["type"],
+                age=age,
+                **flags,
+            )
+            record.email = email
+
+        records = [record for record in records if not record.errors]
+        owners = dict(User.objects.filter(email__in=emails).values_list("email", "id"))
+        existing_ids = set(
+            Pet.objects.filter(id__in=[record.pet.id for record in records]).values_list(
+                "id", flat=True
+            )
+        )
+        seen_ids = set()
+        for record in records:
+            if record.email not in owners:
+                record.errors.append(f"User {record.email} not found")
+            if record.pet.id in existing_ids or record.pet.id in seen_ids:
+                record.errors.append(f"Pet {record.pet.id} already exists")
+            seen_ids.add(record.pet.id)
+            record.pet.user_id = owners.get(record.email)
+
+    def insert(self, records):
+        Pet.objects.bulk_create([record.pet for record in records])
+
+
+class RoomAssigner:
+    """
+    Picks rooms for historical stays in memory, without the availability lookups of a
+    booking. For each private room it keeps the stays already in the database and the
+    ones assigned during the import sorted by checkin, so each check is a binary search.
+    """
+
+    def __init__(self):
+        self._rooms_by_type = None
+        self._stays_by_room = {}
+        self._loaded_room_types = set()
+
+    def get_rooms(self, room_type_id):
+        if self._rooms_by_type is None:
+            self._rooms_by_type = {}
+            for room_type_id_, room_id in Room.objects.values_list(
+                "room_type_id", "id"
+            ).order_by("id"):
+                self._rooms_by_type.setdefault(room_type_id_, []).append(room_id)
+        return self._rooms_by_type.get(room_type_id, [])
+
+    def load_stays(self, room_type_id):
+        if room_type_id in self._loaded_room_types:
+            return
+        self._loaded_room_types.add(room_type_id)
+        stays = (
+            ReservationPet.objects.filter(
+                room_type_id=room_type_id, is_cancelled=False, checkin__isnull=False
+            )
+            .values_list("room_id", "checkin", "checkout")
+            .distinct()
+        )
+        for room_id, checkin, checkout in stays:
+            insort(self._stays_by_room.setdefault(room_id, []), (checkin, checkout))
+
+    def is_free(self, room_id, checkin, checkout):
+        # estadias de um quarto privativo não se sobrepõem: basta olhar a última
+        # que começa antes do checkout pedido
+        stays = self._stays_by_room.get(room_id, [])
+        idx = bisect_left(stays, (checkout,))
+        return idx == 0 or stays[idx - 1][1] <= checkin
+
+    def assign(self, room_type, room_ids, checkin, checkout):
+        """
+        Given the room chosen for each pet of a reservation of one room type, or None
+        when the file has no room, returns the room of each pet in the same order, or
+        None if the stays do not fit. Pets of the same reservation share a private room
+        up to the room type capacity, as in a booking.
+        """
+        rooms = self.get_rooms(room_type.id)
+        if is_shared(room_type):
+            if not rooms:
+                return None
+            return [room_id or rooms[0] for room_id in room_ids]
+
+        self.load_stays(room_type.id)
+        pets_per_room = max(room_type.capacity, 1)
+        chosen = {room_id for room_id in room_ids if room_id}
+        missing = room_ids.count(None)
+        free_rooms = [
+            room_id
+            for room_id in rooms
+            if room_id not in chosen and self.is_free(room_id, checkin, checkout)
+        ][: -(-missing // pets_per_room)]
+        if not all(self.is_free(room_id, checkin, checkout) for room_id in chosen):
+            return None
+        if len(free_rooms) * pets_per_room < missing:
+            return None
+
+        for room_id in chosen | set(free_rooms):
+            insort(self._stays_by_room.setdefault(room_id, []), (checkin, checkout))
+        positions = iter(range(missing))
+        return [
+            room_id or free_rooms[next(positions) // pets_per_room]
+            for room_id in room_ids
+        ]
+
+
+class ReservationImporter(BatchImporter):
+    """
+    One line per pet: reservation, user_email, checkin, checkout, status, pet_id,
+    room_type_id and, optionally, room_id. Consecutive lines with the same reservation
+    value are the pets of one reservation.
+
+    Stays whose checkout already passed are history: they skip the availability checks,
+    get their rooms from a RoomAssigner and are written with bulk_create, together with
+    their nights in the occupancy ledger, under the locks of their room types. Their pets
+    are still checked against the other stays in the database and in the file. The other
+    reservations are booked one by one like in the API, with the room allocation.
+    """
+
+    key = "reservation"
+
+    def __init__(self, rejects, batch_size=1000, today=None):
+        super().__init__(rejects, batch_size)
+        self.today = today or datetime.now().date()
+        self.assigner = RoomAssigner()
+
+    def validate(self, records):
+        for record in records:
+            self.parse(record)
+        records = [record for record in records if not record.errors]
+
+        # uma consulta para os donos, uma para os pets e uma para os quartos do lote
+        emails = {record.email for record in records}
+        owners = dict(User.objects.filter(email__in=emails).values_list("email", "id"))
+        pets = Pet.objects.in_bulk(
+            [pet_id for record in records for pet_id, _, _ in record.stays]
+        )
+        room_ids = [
+            room_id for record in records for _, _, room_id in record.stays if room_id
+        ]
+        rooms = (
+            dict(Room.objects.filter(id__in=room_ids).values_list("id", "room_type_id"))
+            if room_ids
+            else {}
+        )
+
+        for record in records:
+            user_id = owners.get(record.email)
+            if user_id is None:
+                record.errors.append(f"User {record.email} not found")
+            record.user_id = user_id
+            record.pets = {}
+            for pet_id, room_type_id, room_id in record.stays:
+                pet = pets.get(pet_id)
+                room_type = room_type_registry.get(room_type_id)
+                if pet is None:
+                    record.errors.append(f"Pet {pet_id} not found")
+                elif user_id and pet.user_id != user_id:
+                    record.errors.append(f"Pet {pet_id} does not belong to {record.email}")
+                if room_type is None:
+                    record.errors.append(f"Room type {room_type_id} not found")
+                elif pet and not accepts_pet_type(room_type, pet.type):
+                    record.errors.append("Pet not compatible with the room")
+                if room_id and rooms.get(room_id) != room_type_id:
+                    record.errors.append(f"Room {room_id} is not of room type {room_type_id}")
+                if pet:
+                    record.pets[str(pet_id)] = pet
+
+        history = [
+            record for record in records
+            if not record.errors and record.checkout <= self.today
+        ]
+        self.check_pet_overlaps(history)
+        # os preços do lote saem do banco numa consulta, não do registro do processo
+        room_prices = get_room_prices(
+            {room_type_id for record in history for _, room_type_id, _ in record.stays}
+        )
+        for record in history:
+            if not record.errors:
+                self.build_history(record, room_prices)
+
+    def check_pet_overlaps(self, records):
+        """
+        Rejects the history records with a pet that already stays somewhere on the same
+        nights, in the database or in an earlier record of the file, as a booking does
+        with is_any_pet_booked. The stays of the pets of the batch are read with one query.
+        """
+        records = [record for record in records if record.status != "cancelled"]
+        if not records:
+            return
+        stays_by_pet = {}
+        stays = ReservationPet.objects.filter(
+            pet_id__in={pet_id for record in records for pet_id, _, _ in record.stays},
+            is_cancelled=False,
+            checkin__lt=max(record.checkout for record in records),
+            checkout__gt=min(record.checkin for record in records),
+        ).values_list("pet_id", "checkin", "checkout")
+        for pet_id, checkin, checkout in stays:
+            stays_by_pet.setdefault(pet_id, []).append((checkin, checkout))
+
+        # os lotes anteriores já estão no banco, os registros deste entram na lista
+        for record in records:
+            pet_ids = [pet_id for pet_id, _, _ in record.stays]
+            if any(
+                checkin < record.checkout and record.checkin < checkout
+                for pet_id in pet_ids
+                for checkin, checkout in stays_by_pet.get(pet_id, [])
+            ):
+                record.errors.append("Pet is already booked")
+                continue
+            for pet_id in pet_ids:
+                stays_by_pet.setdefault(pet_id, []).append((record.checkin, record.checkout))
+
+    def parse(self, record):
+        first = record.rows[0]
+        for field in ["user_email", "checkin", "checkout"]:
+            if any(row.get(field) != first.get(field) for row in record.rows):
+                record.errors.append(f"{field} differs between the lines of the reservation")
+        status = first.get("status") or "reserved"
+        if status not in ReservationStatusChoices.values:
+            record.errors.append(f"Invalid status '{status}'")
+        record.status = status
+        record.email = User.objects.normalize_email(
+            parse_text(record, first, "user_email", get_max_length(User, "email"), True)
+            or ""
+        )
+        try:
+            record.checkin = parse_date(first.get("checkin"))
+            record.checkout = parse_date(first.get("checkout"))
+            record.stays = [
+                (
+                    parse_uuid(row.get("pet_id")),
+                    int(row.get("room_type_id")),
+                    int(row["room_id"]) if row.get("room_id") else None,
+                )
+                for row in record.rows
+            ]
+        except (TypeError, ValueError) as error:
+            record.errors.append(f"Invalid value: {error}")
+            return
+        if record.checkin >= record.checkout:
+            record.errors.append("Checkout date must be after checkin")
+        # os mesmos limites de uma reserva da API: cada noite é uma linha do ledger
+        elif (record.checkout - record.checkin).days > MAX_SEARCH_NIGHTS:
+            record.errors.append(f"Stay cannot be longer than {MAX_SEARCH_NIGHTS} nights")
+        if not has_next_month(record.checkout):
+            record.errors.append("Date is out of the supported range")
+        pet_ids = [pet_id for pet_id, _, _ in record.stays]
+        if None in pet_ids:
+            record.errors.append("pet_id is required")
+        if len(set(pet_ids)) != len(pet_ids):
+            record.errors.append("Trying to book the same pet twice")
+
+    def build_history(self, record, room_prices):
+        is_cancelled = record.status == "cancelled"
+        record.reservation = Reservation(
+            user_id=record.user_id,
+            checkin=record.checkin,
+            checkout=record.checkout,
+            status="cancelled" if is_cancelled else "concluded",
+        )
+
+        rooms_by_type = {}
+        for pet_id, room_type_id, room_id in record.stays:
+            rooms_by_type.setdefault(room_type_id, []).append(room_id)
+        assigned = {}
+        for room_type_id, room_ids in rooms_by_type.items():
+            room_type = room_type_registry.get(room_type_id)
+            if is_cancelled:
+                # estadias canceladas não ocupam quarto, qualquer um do tipo serve
+                first_room = (self.assigner.get_rooms(room_type_id) or [None])[0]
+                rooms = [room_id or first_room for room_id in room_ids]
+            else:
+                rooms = self.assigner.assign(
+                    room_type, room_ids, record.checkin, record.checkout
+                )
+            if rooms is None or None in rooms:
+                record.errors.append(
+                    f"No rooms of type '{room_type.title}' available on these dates"
+                )
+                return
+            assigned[room_type_id] = iter(rooms)
+
+        record.reservation_pets = [
+            ReservationPet(
+                reservation=record.reservation,
+                pet_id=pet_id,
+                room_id=next(assigned[room_type_id]),
+                room_type_id=room_type_id,
+                checkin=record.checkin,
+                checkout=record.checkout,
+                is_private=not is_shared(room_type_registry.get(room_type_id)),
+                is_cancelled=is_cancelled,
+            )
+            for pet_id, room_type_id, _ in record.stays
+        ]
+        # sem os preços do sistema de origem, o histórico usa os preços atuais
+        price_reservation(record.reservation, record.reservation_pets, [], room_prices)
+
+    def write_batch(self, records):
+        history = [record for record in records if hasattr(record, "reservation")]
+        super().write_batch(history)
+        for record in records:
+            if not hasattr(record, "reservation"):
+                self.book(record)
+
+    def insert(self, records):
+        reservation_pets = [
+            reservation_pet
+            for record in records
+            for reservation_pet in record.reservation_pets
+        ]
+        # os mesmos locks das reservas da API: o ledger muda junto com as estadias do lote
+        with lock_room_types({res_pet.room_type_id for res_pet in reservation_pets}):
+            Reservation.objects.bulk_create([record.reservation for record in records])
+            ReservationPet.objects.bulk_create(reservation_pets)
+            occupy_stays(
+                [
+                    (res_pet.room_id, res_pet.room_type_id, res_pet.checkin, res_pet.checkout)
+                    for res_pet in reservation_pets
+                    if not res_pet.is_cancelled
+                ]
+            )
+        invalidate_stays(reservation_pets)
+
+    def book(self, record):
+        if record.status != "cancelled" and is_any_pet_booked(
+            [pet.id for pet in record.pets.values()], record.checkin, record.checkout
+        ):
+            record.errors.append("Pet is already booked")
+            return
+        serializer = ReservationSerializer(context={"pets": record.pets})
+        booking = {
+            "user": User(id=record.user_id),
+            "checkin": record.checkin,
+            "checkout": record.checkout,
+            "status": record.status,
+            "pet_rooms": [
+                {"pet_id": str(pet_id), "room_type_id": room_type_id}
+                for pet_id, room_type_id, _ in record.stays
+            ],
+        }
+        try:
+            serializer.create(booking)
+        except (RoomUnavailable, DatabaseError) as error:
+            record.errors.append(str(error))
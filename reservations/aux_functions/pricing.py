@@ -0,0 +1,67 @@
+from decimal import Decimal
+from django.db.models import Sum
+from reservations.models import Reservation
+from rooms.models import RoomType
+
+CENTS = Decimal("0.01")
+
+
+def get_nights(checkin, checkout):
+    return (checkout - checkin).days
+
+
+def get_room_prices(room_type_ids):
+    """
+    Returns a dict from room type id to its current nightly price, read from the
+    database: the room type registry of another process may still hold an old price.
+    """
+    return dict(RoomType.objects.filter(id__in=room_type_ids).values_list("id", "price"))
+
+
+def price_reservation(reservation, reservation_pets, reservation_services, room_prices=None):
+    """
+    Fills the prices of a reservation being booked with the current prices: each pet
+    pays the nightly price of its room type for every night of the stay, and each
+    service its unit price times the amount. The lines keep the prices they were
+    booked with, so later price changes do not change past reservations.
+    The room prices are read with get_room_prices, in one query, unless given; the
+    services must be set on the reservation services.
+    """
+    if room_prices is None:
+        room_prices = get_room_prices(
+            {reservation_pet.room_type_id for reservation_pet in reservation_pets}
+        )
+    nights = get_nights(reservation.checkin, reservation.checkout)
+    for reservation_pet in reservation_pets:
+        nightly_price = room_prices[reservation_pet.room_type_id]
+        reservation_pet.nightly_price = nightly_price
+        reservation_pet.price = (nightly_price * nights).quantize(CENTS)
+
+    for reservation_service in reservation_services:
+        reservation_service.unit_price = reservation_service.service.price
+        reservation_service.price = (
+            reservation_service.service.price * reservation_service.amount
+        ).quantize(CENTS)
+
+    reservation.rooms_total = sum(
+        (reservation_pet.price for reservation_pet in reservation_pets), Decimal("0.00")
+    )
+    reservation.services_total = sum(
+        (reservation_service.price for reservation_service in reservation_services),
+        Decimal("0.00"),
+    )
+    reservation.total = reservation.rooms_total + reservation.services_total
+    return reservation.total
+
+
+def get_revenue(start, end):
+    """
+    Sum of the stored totals of the reservations not cancelled with checkin
+    between start (inclusive) and end (exclusive).
+    """
+    revenue = (
+        Reservation.objects.filter(checkin__gte=start, checkin__lt=end)
+        .exclude(status="cancelled")
+        .aggregate(revenue=Sum("total"))["revenue"]
+    )
+    return revenue or Decimal("0.00")
@@ -0,0 +1,44 @@
+from datetime import datetime
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from reservations.models import Reservation, ReservationStatusRun
+
+
+def advance_reservation_statuses(today=None):
+    """
+    Moves the stored status of the reservations from reserved to active on checkin and to
+    concluded after checkout, with one UPDATE per transition, and records the run.
+    The API reads Reservation.objects.with_effective_status() and does not need it, this
+    only keeps the stored column close to it for whoever reads the table directly.
+    Running it again on the same day changes nothing. Returns the recorded ReservationStatusRun.
+    """
+    if today is None:
+        today = datetime.now().date()
+    now = timezone.now()
+
+    with transaction.atomic():
+        concluded = Reservation.objects.filter(
+            Q(status="active", checkout__lte=today)
+            | Q(status__in=["reserved", "active"], checkout__lt=today)
+        ).update(status="concluded", updated_at=now)
+        activated = Reservation.objects.filter(
+            status="reserved", checkin__lte=today, checkout__gt=today
+        ).update(status="active", updated_at=now)
+        run, _ = ReservationStatusRun.objects.update_or_create(
+            id=1,
+            defaults={
+                "ran_at": now,
+                "date": today,
+                "activated": activated,
+                "concluded": concluded,
+            },
+        )
+    return run
+
+
+def get_last_status_run():
+    """
+    Returns the last ReservationStatusRun, or None if the statuses were never advanced.
+    """
+    return ReservationStatusRun.objects.filter(id=1).first()
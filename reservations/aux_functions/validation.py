@@ -0,0 +1,129 @@
+import uuid
+from pets.models import Pet
+from reservations.models import ReservationPet
+from rooms.aux_functions.registry import accepts_pet_type, room_type_registry
+from services.models import Service
+
+
+class InvalidBooking(Exception):
+    """
+    Every problem found in the pets, room types and services of a booking.
+    The status code is 404 when all of them are missing objects and 400 otherwise.
+    """
+
+    def __init__(self, errors, status_code):
+        super().__init__(errors)
+        self.errors = errors
+        self.status_code = status_code
+
+
+def is_numeric_id(value):
+    return type(value) == int or (type(value) == str and value.isnumeric())
+
+
+def parse_pet_id(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def validate_booking(user, pet_rooms, services=None):
+    """
+    Validates the pets, room types and services of a booking in a single pass:
+    one query for the pets, one for the services and the room type registry.
+    Returns the pets found, keyed by the ids sent in the payload, and the services
+    found, keyed by their ids, or raises InvalidBooking with all the errors together.
+    Payloads with the wrong shape are left to the serializer validation.
+    """
+    services = services or []
+    if not isinstance(pet_rooms, list) or not isinstance(services, list):
+        return {}, {}
+    if not all(isinstance(pet_room, dict) for pet_room in pet_rooms):
+        return {}, {}
+    if not all(isinstance(service, dict) for service in services):
+        return {}, {}
+
+    invalid = {"pet_rooms": [], "services": []}
+    not_found = {"pet_rooms": [], "services": []}
+
+    pet_ids = {}
+    stays = []
+    for pet_room in pet_rooms:
+        pet_id = pet_room.get("pet_id")
+        parsed_id = parse_pet_id(pet_id)
+        if parsed_id is None:
+            invalid["pet_rooms"].append("Invalid pet id")
+        elif str(pet_id) in pet_ids:
+            invalid["pet_rooms"].append("Trying to book the same pet twice")
+        else:
+            pet_ids[str(pet_id)] = parsed_id
+
+        room_type_id = pet_room.get("room_type_id")
+        if not is_numeric_id(room_type_id):
+            invalid["pet_rooms"].append("Invalid room type id")
+        else:
+            stays.append((str(pet_id), int(room_type_id)))
+
+    service_ids = {}
+    for service in services:
+        service_id = service.get("service_id")
+        if not is_numeric_id(service_id):
+            invalid["services"].append("Invalid service id")
+        else:
+            service_ids[int(service_id)] = service_id
+
+    # uma consulta para os pets e outra para os serviços, tudo o resto é em memória
+    pets_by_id = Pet.objects.in_bulk(list(pet_ids.values())) if pet_ids else {}
+    services_by_id = (
+        Service.objects.in_bulk(list(service_ids)) if service_ids else {}
+    )
+
+    pets = {}
+    for pet_id, parsed_id in pet_ids.items():
+        pet = pets_by_id.get(parsed_id)
+        if pet is None:
+            not_found["pet_rooms"].append(f"Pet {pet_id} not found")
+        elif not user.is_adm and pet.user_id != user.id:
+            invalid["pet_rooms"].append(f"Pet {pet_id} does not belong to the user")
+        else:
+            pets[pet_id] = pet
+
+    for pet_id, room_type_id in stays:
+        room_type = room_type_registry.get(room_type_id)
+        if room_type is None:
+            not_found["pet_rooms"].append(f"Room type {room_type_id} not found")
+        elif pet_id in pets and not accepts_pet_type(room_type, pets[pet_id].type):
+            invalid["pet_rooms"].append("Pet not compatible with the room")
+
+    found_services = {}
+    for parsed_id, service_id in service_ids.items():
+        service = services_by_id.get(parsed_id)
+        if service is None:
+            not_found["services"].append(f"Service {service_id} not found")
+        else:
+            found_services[parsed_id] = service
+
+    errors = {
+        field: invalid[field] + not_found[field]
+        for field in ("pet_rooms", "services")
+        if invalid[field] or not_found[field]
+    }
+    if errors:
+        has_invalid = any(invalid.values())
+        raise InvalidBooking(errors, 400 if has_invalid else 404)
+
+    return pets, found_services
+
+
+def is_any_pet_booked(pet_ids, checkin, checkout):
+    """
+    Returns true if any of the pets has a stay, not cancelled, overlapping the window.
+    """
+    # uma consulta só, pelo índice (pet, checkin) das estadias
+    return ReservationPet.objects.filter(
+        pet_id__in=pet_ids,
+        is_cancelled=False,
+        checkin__lt=checkout,
+        checkout__gt=checkin,
+    ).exists()
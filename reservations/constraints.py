@@ -0,0 +1,142 @@
+import uuid
+from django.db import IntegrityError, connections
+
+NO_OVERLAP_CONSTRAINT = "reservation_pet_no_overlap"
+
+# duas estadias de reservas diferentes não podem ocupar o mesmo quarto privativo na mesma noite,
+# pets da mesma reserva podem dividir o quarto
+POSTGRESQL_CONSTRAINT = f"""
+    ALTER TABLE reservations_reservationpet ADD CONSTRAINT {NO_OVERLAP_CONSTRAINT}
+    EXCLUDE USING gist (
+        room_id WITH =,
+        reservation_id WITH <>,
+        daterange(checkin, checkout, '[)') WITH &&
+    ) WHERE (is_private AND NOT is_cancelled)
+"""
+
+SQLITE_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS {NO_OVERLAP_CONSTRAINT}_{{event}}
+    BEFORE {{statement}} ON reservations_reservationpet
+    WHEN NEW.is_private AND NOT NEW.is_cancelled
+    BEGIN
+        SELECT RAISE(ABORT, '{NO_OVERLAP_CONSTRAINT}')
+        WHERE EXISTS (
+            SELECT 1 FROM reservations_reservationpet
+            WHERE room_id = NEW.room_id
+            AND reservation_id != NEW.reservation_id
+            AND is_private AND NOT is_cancelled
+            AND checkin < NEW.checkout AND NEW.checkin < checkout
+        );
+    END
+"""
+
+SQLITE_EVENTS = {
+    "insert": "INSERT",
+    "update": "UPDATE OF room_id, reservation_id, checkin, checkout, is_private, is_cancelled",
+}
+
+
+# estadias já gravadas que a constraint recusaria, mostradas antes de criá-la
+OVERLAPPING_STAYS = """
+    SELECT stay.id, other.id, stay.room_id,
+        stay.checkin, stay.checkout, other.checkin, other.checkout
+    FROM reservations_reservationpet stay
+    JOIN reservations_reservationpet other
+        ON stay.room_id = other.room_id
+        AND stay.id < other.id
+        AND stay.reservation_id <> other.reservation_id
+    WHERE stay.is_private AND NOT stay.is_cancelled
+    AND other.is_private AND NOT other.is_cancelled
+    AND stay.checkin < other.checkout AND other.checkin < stay.checkout
+    ORDER BY stay.room_id, stay.checkin
+"""
+MAX_REPORTED_OVERLAPS = 50
+
+
+def check_overlapping_stays(connection):
+    """
+    Raises an IntegrityError listing the stays of different reservations that already
+    share a private room on the same night, which the constraint would not accept.
+    They must be moved to other rooms or cancelled before migrating.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(OVERLAPPING_STAYS)
+        overlaps = cursor.fetchmany(MAX_REPORTED_OVERLAPS + 1)
+    if not overlaps:
+        return
+
+    lines = [
+        f"room {room_id}: reservation pet {uuid.UUID(str(first_id))}"
+        f" ({first_checkin} to {first_checkout}) overlaps reservation pet"
+        f" {uuid.UUID(str(second_id))} ({second_checkin} to {second_checkout})"
+        for (
+            first_id, second_id, room_id,
+            first_checkin, first_checkout, second_checkin, second_checkout,
+        ) in overlaps[:MAX_REPORTED_OVERLAPS]
+    ]
+    if len(overlaps) > MAX_REPORTED_OVERLAPS:
+        lines.append("...")
+    raise IntegrityError(
+        "Private rooms with overlapping stays, move or cancel them before migrating:\n"
+        + "\n".join(lines)
+    )
+
+
+def create_sqlite_triggers(cursor):
+    for event, statement in SQLITE_EVENTS.items():
+        cursor.execute(SQLITE_TRIGGER.format(event=event, statement=statement))
+
+
+def create_no_overlap_constraint(apps, schema_editor):
+    """
+    Rejects overlapping stays in the same private room: an exclusion constraint on
+    PostgreSQL, triggers on SQLite. Other databases rely on the booking lock only.
+    Fails listing the conflicting stays if the existing rows already overlap.
+
+    On PostgreSQL the constraint needs the btree_gist extension. It is created here,
+    which requires a superuser before PostgreSQL 13 and the CREATE privilege on the
+    database from 13 on; otherwise it must be created beforehand by a superuser.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor in ("postgresql", "sqlite"):
+        check_overlapping_stays(schema_editor.connection)
+    if vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        schema_editor.execute(POSTGRESQL_CONSTRAINT)
+    elif vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            create_sqlite_triggers(cursor)
+
+
+def drop_no_overlap_constraint(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            f"ALTER TABLE reservations_reservationpet DROP CONSTRAINT {NO_OVERLAP_CONSTRAINT}"
+        )
+    elif vendor == "sqlite":
+        for event in SQLITE_EVENTS:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {NO_OVERLAP_CONSTRAINT}_{event}")
+
+
+def ensure_sqlite_triggers(sender, using, **kwargs):
+    """
+    SQLite drops the triggers whenever a migration rebuilds the table, so they are
+    created again, if missing, after every migrate.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        if "reservations_reservationpet" not in connection.introspection.table_names(cursor):
+            return
+        columns = connection.introspection.get_table_description(
+            cursor, "reservations_reservationpet"
+        )
+        # antes da migração que cria as colunas não há o que proteger
+        if "is_cancelled" in {column.name for column in columns}:
+            create_sqlite_triggers(cursor)
+
+
+def is_overlap_error(error):
+    return NO_OVERLAP_CONSTRAINT in str(error)
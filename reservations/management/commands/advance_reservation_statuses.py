@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from reservations.aux_functions.statuses import (
+    advance_reservation_statuses,
+    get_last_status_run,
+)
+
+
+class Command(BaseCommand):
+    help = "Moves reservations to active on checkin and to concluded after checkout."
+
+    def handle(self, *args, **options):
+        last_run = get_last_status_run()
+        if last_run:
+            self.stdout.write(f"Last run: {last_run.ran_at:%Y-%m-%d %H:%M:%S}")
+
+        run = advance_reservation_statuses()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{run.activated} reservations activated, {run.concluded} concluded"
+            )
+        )
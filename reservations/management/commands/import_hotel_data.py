@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from reservations.aux_functions.importer import (
+    PetImporter,
+    RejectsFile,
+    ReservationImporter,
+    UserImporter,
+)
+
+
+class Command(BaseCommand):
+    help = "Imports users, pets and reservations from .csv or .jsonl files, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", help="File with one user per line.")
+        parser.add_argument("--pets", help="File with one pet per line.")
+        parser.add_argument(
+            "--reservations",
+            help="File with one pet per line, grouped into reservations by the reservation column.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--rejects",
+            default="import_rejects.jsonl",
+            help="Where the rejected lines are written, with their errors.",
+        )
+
+    def handle(self, *args, **options):
+        # usuários antes dos pets, e pets antes das reservas que apontam para eles
+        files = [
+            (options[name], importer)
+            for name, importer in [
+                ("users", UserImporter),
+                ("pets", PetImporter),
+                ("reservations", ReservationImporter),
+            ]
+            if options[name]
+        ]
+        if not files:
+            raise CommandError("Nothing to import, use --users, --pets or --reservations")
+        for path, _ in files:
+            if not path.endswith((".csv", ".jsonl")):
+                raise CommandError(f"Unsupported file format: {path}")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        rejects = RejectsFile(options["rejects"])
+        try:
+            for path, importer in files:
+                result = importer(rejects, options["batch_size"]).run(path)
+                self.stdout.write(
+                    f"{path}: {result.imported} imported, {result.rejected} rejected, "
+                    f"{result.rows} rows in {result.seconds:.1f} s "
+                    f"({result.rows_per_second:.0f} rows/s)"
+                )
+        finally:
+            rejects.close()
+
+        if rejects.count:
+            self.stdout.write(
+                self.style.WARNING(f"{rejects.count} records rejected, see {rejects.path}")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("Import finished with no rejects"))
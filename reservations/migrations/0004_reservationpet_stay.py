@@ -0,0 +1,51 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_stays(apps, schema_editor):
+    Reservation = apps.get_model("reservations", "Reservation")
+    ReservationPet = apps.get_model("reservations", "ReservationPet")
+
+    reservation = Reservation.objects.filter(id=OuterRef("reservation_id"))
+    ReservationPet.objects.filter(reservation__isnull=False).update(
+        checkin=Subquery(reservation.values("checkin")[:1]),
+        checkout=Subquery(reservation.values("checkout")[:1]),
+    )
+    ReservationPet.objects.filter(reservation__status="cancelled").update(
+        is_cancelled=True
+    )
+    ReservationPet.objects.filter(
+        room__room_type__title="Quarto Compartilhado"
+    ).update(is_private=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0003_roomoccupancy"),
+        ("reservations", "0003_alter_reservation_status_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reservationpet",
+            name="checkin",
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name="reservationpet",
+            name="checkout",
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name="reservationpet",
+            name="is_cancelled",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="reservationpet",
+            name="is_private",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(copy_stays, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+from reservations.constraints import (
+    create_no_overlap_constraint,
+    drop_no_overlap_constraint,
+)
+
+
+# No PostgreSQL precisa da extensão btree_gist, criada aqui: exige superusuário antes do
+# PostgreSQL 13 e o privilégio CREATE no banco a partir do 13 (ver README). Falha listando
+# as estadias em conflito se já houver estadias sobrepostas em quartos privativos.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0004_reservationpet_stay"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_no_overlap_constraint, drop_no_overlap_constraint),
+    ]
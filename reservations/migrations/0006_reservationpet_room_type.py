@@ -0,0 +1,45 @@
+# Generated by Django 4.1.5 on 2026-10-18 08:59
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def copy_room_types(apps, schema_editor):
+    Room = apps.get_model("rooms", "Room")
+    ReservationPet = apps.get_model("reservations", "ReservationPet")
+
+    room = Room.objects.filter(id=OuterRef("room_id"))
+    ReservationPet.objects.update(room_type=Subquery(room.values("room_type_id")[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0004_roomtype_kind"),
+        ("reservations", "0005_reservationpet_no_overlap"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reservationpet",
+            name="room_type",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="rooms.roomtype",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservationpet",
+            index=models.Index(
+                fields=["room_type", "checkin", "checkout"], name="stay_type_dates_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservationpet",
+            index=models.Index(fields=["pet", "checkin"], name="stay_pet_checkin_idx"),
+        ),
+        migrations.RunPython(copy_room_types, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0006_reservationpet_room_type"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReservationStatusRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("ran_at", models.DateTimeField()),
+                ("date", models.DateField()),
+                ("activated", models.IntegerField(default=0)),
+                ("concluded", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 4.1.5 on 2026-10-18 14:10
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def price_reservations(apps, schema_editor):
+    # não há registro dos preços antigos: as reservas existentes usam os preços atuais
+    Reservation = apps.get_model("reservations", "Reservation")
+    ReservationPet = apps.get_model("reservations", "ReservationPet")
+    ReservationService = apps.get_model("reservations", "ReservationService")
+    RoomType = apps.get_model("rooms", "RoomType")
+    Service = apps.get_model("services", "Service")
+
+    room_prices = dict(RoomType.objects.values_list("id", "price"))
+    service_prices = dict(Service.objects.values_list("id", "price"))
+    nights = {
+        reservation_id: (checkout - checkin).days
+        for reservation_id, checkin, checkout in Reservation.objects.values_list(
+            "id", "checkin", "checkout"
+        )
+    }
+    rooms_totals = {}
+    services_totals = {}
+
+    reservation_pets = list(
+        ReservationPet.objects.filter(reservation__isnull=False, room_type__isnull=False)
+    )
+    for reservation_pet in reservation_pets:
+        reservation_pet.nightly_price = room_prices[reservation_pet.room_type_id]
+        reservation_pet.price = (
+            reservation_pet.nightly_price * nights[reservation_pet.reservation_id]
+        )
+        rooms_totals[reservation_pet.reservation_id] = (
+            rooms_totals.get(reservation_pet.reservation_id, Decimal("0.00"))
+            + reservation_pet.price
+        )
+    ReservationPet.objects.bulk_update(
+        reservation_pets, ["nightly_price", "price"], batch_size=1000
+    )
+
+    reservation_services = list(
+        ReservationService.objects.filter(
+            reservation__isnull=False, service__isnull=False
+        )
+    )
+    for reservation_service in reservation_services:
+        reservation_service.unit_price = service_prices[reservation_service.service_id]
+        reservation_service.price = (
+            reservation_service.unit_price * reservation_service.amount
+        )
+        services_totals[reservation_service.reservation_id] = (
+            services_totals.get(reservation_service.reservation_id, Decimal("0.00"))
+            + reservation_service.price
+        )
+    ReservationService.objects.bulk_update(
+        reservation_services, ["unit_price", "price"], batch_size=1000
+    )
+
+    reservations = []
+    for reservation_id in nights:
+        reservation = Reservation(id=reservation_id)
+        reservation.rooms_total = rooms_totals.get(reservation_id, Decimal("0.00"))
+        reservation.services_total = services_totals.get(reservation_id, Decimal("0.00"))
+        reservation.total = reservation.rooms_total + reservation.services_total
+        reservations.append(reservation)
+    Reservation.objects.bulk_update(
+        reservations, ["rooms_total", "services_total", "total"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0004_roomtype_kind"),
+        ("services", "0002_auto_20230105_1847"),
+        ("reservations", "0008_reservation_created_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reservation",
+            name="rooms_total",
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name="reservation",
+            name="services_total",
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name="reservation",
+            name="total",
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name="reservationpet",
+            name="nightly_price",
+            field=models.DecimalField(decimal_places=2, max_digits=8, null=True),
+        ),
+        migrations.AddField(
+            model_name="reservationpet",
+            name="price",
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name="reservationservice",
+            name="price",
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name="reservationservice",
+            name="unit_price",
+            field=models.DecimalField(decimal_places=2, max_digits=8, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(fields=["checkin", "total"], name="reservation_revenue_idx"),
+        ),
+        migrations.RunPython(price_reservations, migrations.RunPython.noop),
+    ]
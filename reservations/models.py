@@ -1,5 +1,7 @@
 import uuid
+from datetime import datetime
 from django.db import models
+from django.db.models import Case, Q, Value, When
 from django.core.validators import MinValueValidator
 
 
@@ -10,6 +12,30 @@ class ReservationStatusChoices(models.Choices):
     CANCELLED = "cancelled"
 
 
+class ReservationQuerySet(models.QuerySet):
+    def with_effective_status(self, today=None):
+        """
+        Annotates effective_status, the status of each reservation on the given day
+        (today by default). Only cancellations have to be stored: a reservation is
+        active from checkin and concluded from checkout, and the stored status is
+        only used when it is further along than the dates.
+        """
+        if today is None:
+            today = datetime.now().date()
+        return self.annotate(
+            effective_status=Case(
+                When(status="cancelled", then=Value("cancelled")),
+                When(
+                    Q(status="concluded") | Q(checkout__lte=today),
+                    then=Value("concluded"),
+                ),
+                When(Q(status="active") | Q(checkin__lte=today), then=Value("active")),
+                default=Value("reserved"),
+                output_field=models.CharField(max_length=9),
+            )
+        )
+
+
 class Reservation(models.Model):
     id = models.UUIDField(default=uuid.uuid4, primary_key=True, editable=False)
     checkin = models.DateField()
@@ -22,6 +48,45 @@ class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     user = models.ForeignKey("users.User", on_delete=models.CASCADE, null=True)
+    # preços do momento da reserva, ver reservations/aux_functions/pricing.py
+    rooms_total = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    services_total = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    total = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+
+    objects = ReservationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="reservation_created_idx"),
+            models.Index(fields=["checkin", "total"], name="reservation_revenue_idx"),
+            models.Index(
+                fields=["user", "created_at", "id"], name="reservation_user_created_idx"
+            ),
+        ]
+
+    def get_effective_status(self, today=None):
+        """
+        Same rules of ReservationQuerySet.with_effective_status, for a single reservation.
+        """
+        if today is None and hasattr(self, "effective_status"):
+            return self.effective_status
+        if today is None:
+            today = datetime.now().date()
+        if self.status == "cancelled":
+            return "cancelled"
+        if self.status == "concluded" or self.checkout <= today:
+            return "concluded"
+        if self.status == "active" or self.checkin <= today:
+            return "active"
+        return "reserved"
+
+
+class ReservationStatusRun(models.Model):
+    # uma única linha, com a última execução de advance_reservation_statuses
+    ran_at = models.DateTimeField()
+    date = models.DateField()
+    activated = models.IntegerField(default=0)
+    concluded = models.IntegerField(default=0)
 
 
 class ReservationService(models.Model):
@@ -36,6 +101,8 @@ class ReservationService(models.Model):
         null=True,
     )
     amount = models.IntegerField(validators=[MinValueValidator(0)])
+    unit_price = models.DecimalField(max_digits=8, decimal_places=2, null=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
 
 
 class ReservationPet(models.Model):
@@ -48,3 +115,24 @@ class ReservationPet(models.Model):
     )
     pet = models.ForeignKey("pets.Pet", on_delete=models.CASCADE)
     room = models.ForeignKey("rooms.Room", on_delete=models.CASCADE)
+    # cópia do tipo do quarto, das datas e do status da reserva, para que as consultas de
+    # conflito e de ocupação e a restrição de sobreposição de reservations/constraints.py
+    # leiam só esta tabela
+    room_type = models.ForeignKey(
+        "rooms.RoomType", on_delete=models.CASCADE, related_name="+", null=True
+    )
+    checkin = models.DateField(null=True)
+    checkout = models.DateField(null=True)
+    is_private = models.BooleanField(default=True)
+    is_cancelled = models.BooleanField(default=False)
+    nightly_price = models.DecimalField(max_digits=8, decimal_places=2, null=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["room_type", "checkin", "checkout"],
+                name="stay_type_dates_idx",
+            ),
+            models.Index(fields=["pet", "checkin"], name="stay_pet_checkin_idx"),
+        ]
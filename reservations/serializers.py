@@ -1,14 +1,21 @@
 from rest_framework import serializers
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
+from django.http import Http404
 from django.core.exceptions import ValidationError
+from .aux_functions.pricing import price_reservation
+from .constraints import is_overlap_error
 from .models import (
     Reservation,
     ReservationService,
     ReservationPet,
     ReservationStatusChoices,
 )
-from rooms.models import RoomType, Room
-from rooms.aux_functions.availability import get_available_room
+from rooms.aux_functions.availability import RoomUnavailable, allocate_rooms
+from rooms.aux_functions.locks import lock_room_types
+from rooms.aux_functions.registry import is_shared, room_type_registry
+from rooms.aux_functions.occupancy import occupy_rooms
+from rooms.serializers import MAX_SEARCH_NIGHTS, validate_supported_date
+from rooms.signals import invalidate_stays
 from services.models import Service
 from pets.models import Pet
 from datetime import datetime
@@ -37,8 +44,9 @@ class ReservationSerializer(serializers.Serializer):
     status = serializers.ChoiceField(
         choices=ReservationStatusChoices.choices, allow_null=True, required=False
     )
-    checkin = serializers.DateField()
-    checkout = serializers.DateField()
+    # as mesmas datas aceitas pela busca de disponibilidade
+    checkin = serializers.DateField(validators=[validate_supported_date])
+    checkout = serializers.DateField(validators=[validate_supported_date])
     created_at = serializers.DateTimeField(read_only=True)
     updated_at = serializers.DateTimeField(read_only=True)
     pet_rooms = PetRoomsSerializer(many=True, write_only=True)
@@ -47,94 +55,114 @@ class ReservationSerializer(serializers.Serializer):
         allow_null=True, required=False, many=True, write_only=True
     )
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # o status guardado só muda no cancelamento, o resto vem das datas
+        data["status"] = instance.get_effective_status()
+        return data
+
     def create(self, validated_data):
         # SERIALIZER CREATE
-        newReservation = Reservation()
-        newReservation.user = validated_data["user"]
-        newReservation.checkin = validated_data["checkin"]
-        newReservation.checkout = validated_data["checkout"]
-        if "status" in validated_data:
-            newReservation.status = validated_data["status"]
-
-        newReservation.save()
-        if "services" in validated_data:
-            reservation_services = self.create_reservation_services(
-                validated_data["services"]
-            )
-            newReservation.reservation_services.set(reservation_services)
-        reservation_pets = self.create_reservation_pets(
-            validated_data["pet_rooms"],
-            validated_data["checkin"],
-            validated_data["checkout"],
-        )
-        newReservation.reservation_pets.set(reservation_pets)
-        newReservation.save()
-        return newReservation
-
-    def create_reservation_services(self, services):
-        reservation_services = []
-        for serv in services:
-            service = get_object_or_404(Service, id=serv["service_id"])
-            reservation_service = ReservationService.objects.create(
-                amount=serv["amount"], service=service
-            )
-            reservation_services.append(reservation_service)
-        return reservation_services
-
-    def create_reservation_pets(self, pet_rooms, checkin, checkout):
-        self.validate_pet_rooms(pet_rooms)
-        cat_room = RoomType.objects.get(title="Quarto Privativo (gatos)")
-        pet_rooms_cat = [pr for pr in pet_rooms if pr["room_type_id"] == cat_room.id]
-
-        dog_room = RoomType.objects.get(title="Quarto Privativo (cães)")
-        pet_rooms_dog = [pr for pr in pet_rooms if pr["room_type_id"] == dog_room.id]
-
-        shared_room = RoomType.objects.get(title="Quarto Compartilhado")
-        pet_rooms_shared = [
-            pr for pr in pet_rooms if pr["room_type_id"] == shared_room.id
+        pets = self.get_pets(validated_data["pet_rooms"])
+        room_type_ids = [
+            pet_room["room_type_id"] for pet_room in validated_data["pet_rooms"]
         ]
 
-        pets_in_the_room = 0
-        all_reservation_pets = []
-        for i, pet_room in enumerate(pet_rooms_cat):
-            current_pet = get_object_or_404(Pet, id=pet_room["pet_id"])
-            if pets_in_the_room == 2 or i == 0:
-                available_room = get_available_room(
-                    checkin, checkout, pet_room["room_type_id"], all_reservation_pets
-                )
-                pets_in_the_room = 0
-            pets_in_the_room += 1
-
-            reservation_pet = ReservationPet.objects.create(
-                pet=current_pet, room=available_room
+        # o lock abre a transação: se a alocação ou uma inserção falhar nada é gravado
+        with lock_room_types(room_type_ids):
+            newReservation = Reservation(
+                user=validated_data["user"],
+                checkin=validated_data["checkin"],
+                checkout=validated_data["checkout"],
             )
-            all_reservation_pets.append(reservation_pet)
+            if "status" in validated_data:
+                newReservation.status = validated_data["status"]
 
-        for i, pet_room in enumerate(pet_rooms_dog):
-            current_pet = get_object_or_404(Pet, id=pet_room["pet_id"])
-            if pets_in_the_room == 2 or i == 0:
-                available_room = get_available_room(
-                    checkin, checkout, pet_room["room_type_id"], all_reservation_pets
+            reservation_pets = self.build_reservation_pets(
+                validated_data["pet_rooms"], pets, newReservation
+            )
+            reservation_services = self.build_reservation_services(
+                validated_data.get("services") or [], newReservation
+            )
+            price_reservation(newReservation, reservation_pets, reservation_services)
+            newReservation.save()
+            ReservationService.objects.bulk_create(reservation_services)
+            self.insert_reservation_pets(reservation_pets)
+            if newReservation.status != "cancelled":
+                occupy_rooms(
+                    reservation_pets, newReservation.checkin, newReservation.checkout
                 )
-                pets_in_the_room = 0
-            pets_in_the_room += 1
+        return newReservation
 
-            reservation_pet = ReservationPet.objects.create(
-                pet=current_pet, room=available_room
+    def build_reservation_services(self, services, reservation):
+        if not services:
+            return []
+        found_services = self.context.get("services") or self.get_services(services)
+        return [
+            ReservationService(
+                reservation=reservation,
+                amount=serv["amount"],
+                service=found_services[serv["service_id"]],
             )
-            all_reservation_pets.append(reservation_pet)
+            for serv in services
+        ]
 
-        for pet_room in pet_rooms_shared:
-            current_pet = get_object_or_404(Pet, id=pet_room["pet_id"])
-            available_room = get_available_room(
-                checkin, checkout, pet_room["room_type_id"], all_reservation_pets
-            )
-            reservation_pet = ReservationPet.objects.create(
-                pet=current_pet, room=available_room
+    def get_services(self, services):
+        found_services = Service.objects.in_bulk(
+            [serv["service_id"] for serv in services]
+        )
+        if len(found_services) != len({serv["service_id"] for serv in services}):
+            raise Http404("No Service matches the given query.")
+        return found_services
+
+    def get_pets(self, pet_rooms):
+        self.validate_pet_rooms(pet_rooms)
+        # a view já valida e carrega os pets, ver reservations/aux_functions/validation.py
+        if self.context.get("pets"):
+            return self.context["pets"]
+        pets = {
+            str(pet_id): pet
+            for pet_id, pet in Pet.objects.in_bulk(
+                [pet_room["pet_id"] for pet_room in pet_rooms]
+            ).items()
+        }
+        if len(pets) != len(pet_rooms):
+            raise Http404("No Pet matches the given query.")
+        return pets
+
+    def build_reservation_pets(self, pet_rooms, pets, reservation):
+        available_rooms = allocate_rooms(
+            reservation.checkin,
+            reservation.checkout,
+            [pet_room["room_type_id"] for pet_room in pet_rooms],
+        )
+        return [
+            ReservationPet(
+                reservation=reservation,
+                pet=pets[pet_room["pet_id"]],
+                room=available_room,
+                room_type_id=available_room.room_type_id,
+                checkin=reservation.checkin,
+                checkout=reservation.checkout,
+                is_private=not is_shared(
+                    room_type_registry.get(available_room.room_type_id)
+                ),
+                is_cancelled=reservation.status == "cancelled",
             )
-            all_reservation_pets.append(reservation_pet)
+            for pet_room, available_room in zip(pet_rooms, available_rooms)
+        ]
 
-        return all_reservation_pets
+    def insert_reservation_pets(self, reservation_pets):
+        try:
+            with transaction.atomic():
+                ReservationPet.objects.bulk_create(reservation_pets)
+        except IntegrityError as error:
+            # o banco recusa a estadia se outra reserva já ocupa o quarto nessas datas
+            if is_overlap_error(error):
+                raise RoomUnavailable("Room is already booked on these dates")
+            raise
+        # bulk_create não dispara os signals de post_save das estadias
+        invalidate_stays(reservation_pets)
 
     def validate_checkin(self, checkin):
         checkout_date = datetime.strptime(
@@ -142,6 +170,9 @@ class ReservationSerializer(serializers.Serializer):
         ).date()
         if checkin >= checkout_date:
             raise ValidationError("Checkout date must be after checkin")
+        # a estadia ocupa uma linha do ledger por noite
+        if (checkout_date - checkin).days > MAX_SEARCH_NIGHTS:
+            raise ValidationError(f"Stay cannot be longer than {MAX_SEARCH_NIGHTS} nights")
         if checkin < datetime.now().date():
             raise ValidationError("Cannot book a reservation in the past")
         return checkin
@@ -157,3 +188,35 @@ class ReservationSerializer(serializers.Serializer):
                 raise ValidationError("Trying to book the same pet twice", "400")
 
         return pet_rooms
+
+
+class PetRoomReadSerializer(serializers.Serializer):
+    pet = serializers.CharField(source="pet.name")
+    rooms_type_id = serializers.IntegerField(source="room_type_id")
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class ReservationServiceReadSerializer(serializers.Serializer):
+    service = serializers.CharField(source="service.name")
+    amount = serializers.IntegerField()
+    unit_price = serializers.DecimalField(max_digits=8, decimal_places=2)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class ReservationListSerializer(serializers.Serializer):
+    """
+    Read-only shape of the reservation listing. Expects the pets and services of each
+    reservation to be prefetched, see ReservationsView.get_queryset.
+    """
+
+    id = serializers.UUIDField()
+    status = serializers.CharField(source="get_effective_status")
+    checkin = serializers.DateField()
+    checkout = serializers.DateField()
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
+    total = serializers.DecimalField(max_digits=10, decimal_places=2)
+    pets_rooms = PetRoomReadSerializer(source="reservation_pets", many=True)
+    services = ReservationServiceReadSerializer(
+        source="reservation_services", many=True
+    )
@@ -1,7 +1,14 @@
 from django.urls import path
-from .views import ReservationsView, ReservationDeleteView
+from .views import (
+    ReservationsView,
+    ReservationDeleteView,
+    ReservationExportView,
+    ReservationLocksView,
+)
 
 urlpatterns = [
     path("reservations/", ReservationsView.as_view()),
+    path("reservations/locks/", ReservationLocksView.as_view()),
+    path("reservations/export/", ReservationExportView.as_view()),
     path("reservations/<uuid:reservation_id>/", ReservationDeleteView.as_view()),
 ]
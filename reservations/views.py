@@ -3,21 +3,29 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import ListCreateAPIView
 from rest_framework.views import APIView, Response, status
+from django.db import transaction
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
-from .models import Reservation
-from .serializers import ReservationSerializer
+from .models import Reservation, ReservationPet, ReservationService
+from .serializers import ReservationSerializer, ReservationListSerializer
 from .permissions import IsAccountOwner, IsAdm
-from pets.models import Pet
-from rooms.models import RoomType
-from rooms.aux_functions.dates import are_dates_conflicting
+from .aux_functions.validation import (
+    InvalidBooking,
+    is_any_pet_booked,
+    validate_booking,
+)
+from _core.export import export_response, get_export_format
+from _core.pagination import CreatedAtCursorPagination
 from rooms.aux_functions.availability import RoomUnavailable
-import uuid
+from rooms.aux_functions.occupancy import release_rooms
+from rooms.aux_functions.locks import get_lock_stats
 import ipdb
 
 
 class ReservationsView(ListCreateAPIView):
     queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
+    pagination_class = CreatedAtCursorPagination
 
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -34,12 +42,14 @@ class ReservationsView(ListCreateAPIView):
         if "services" in serializer.validated_data:
             response_dict = {
                 **serializer.data,
+                "total": str(serializer.instance.total),
                 "pet_rooms": serializer.validated_data["pet_rooms"],
                 "services": serializer.validated_data["services"],
             }
         else:
             response_dict = {
                 **serializer.data,
+                "total": str(serializer.instance.total),
                 "pet_rooms": serializer.validated_data["pet_rooms"],
             }
         return Response(response_dict, status=status.HTTP_201_CREATED, headers=headers)
@@ -47,121 +57,68 @@ class ReservationsView(ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-    def post(self, request, *args, **kwargs):
-        if "services" in request.data:
-            for service in request.data["services"]:
-                if (
-                    type(service["service_id"]) != int
-                    and not service["service_id"].isnumeric()
-                ):
-                    return Response(
-                        {"message": "Invalid service id"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # pets e serviços já carregados pela validação do post
+        context.update(getattr(self, "booking", {}))
+        return context
 
+    def post(self, request, *args, **kwargs):
         if "pet_rooms" in request.data:
-            # validate id's:
-            for pet_room in request.data["pet_rooms"]:
-                pet_id = pet_room["pet_id"]
-                try:
-                    uuid.UUID(pet_id)
-                except ValueError:
-                    return Response(
-                        {"message": "Invalid pet id"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-                room_type_id = pet_room["room_type_id"]
-                if (
-                    type(room_type_id) != int
-                    and not pet_room["room_type_id"].isnumeric()
-                ):
-                    return Response(
-                        {"message": "Invalid room type id"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-            for data in request.data["pet_rooms"]:
-                pet_obj = get_object_or_404(Pet.objects.all(), id=data["pet_id"])
-                room_obj = get_object_or_404(
-                    RoomType.objects.all(), id=data["room_type_id"]
+            try:
+                pets, services = validate_booking(
+                    request.user,
+                    request.data["pet_rooms"],
+                    request.data.get("services"),
+                )
+            except InvalidBooking as e:
+                return Response(e.errors, status=e.status_code)
+            self.booking = {"pets": pets, "services": services}
+
+            try:
+                checkin = datetime.strptime(request.data["checkin"], "%Y-%m-%d").date()
+                checkout = datetime.strptime(request.data["checkout"], "%Y-%m-%d").date()
+            except (KeyError, TypeError, ValueError):
+                # datas inválidas são reportadas pela validação do serializer
+                return self.create(request, *args, **kwargs)
+
+            if pets and is_any_pet_booked(
+                [pet.id for pet in pets.values()], checkin, checkout
+            ):
+                return Response(
+                    {"detail": "Pet is already booked"},
+                    status.HTTP_400_BAD_REQUEST,
                 )
-
-                if pet_obj.type == "dog" and "gatos" in room_obj.title:
-                    return Response(
-                        {"detail": "Pet not compatible with the room"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                if (
-                    pet_obj.type == "cat"
-                    and "cães" in room_obj.title
-                    or pet_obj.type == "cat"
-                    and "Compartilhado" in room_obj.title
-                ):
-                    return Response(
-                        {"detail": "Pet not compatible with the room"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-            for data in request.data["pet_rooms"]:
-                pet_id = data["pet_id"]
-                reservations = Reservation.objects.all()
-
-                for reservation in reservations:
-                    for reservation_pet in reservation.reservation_pets.all():
-                        checkin = datetime.strptime(
-                            request.data["checkin"], "%Y-%m-%d"
-                        ).date()
-                        checkout = datetime.strptime(
-                            request.data["checkout"], "%Y-%m-%d"
-                        ).date()
-
-                        if (
-                            str(reservation_pet.pet.id) == pet_id
-                            and are_dates_conflicting(
-                                checkin,
-                                checkout,
-                                reservation.checkin,
-                                reservation.checkout,
-                            )
-                            and reservation.status != "cancelled"
-                        ):
-                            return Response(
-                                {"detail": "Pet is already booked"},
-                                status.HTTP_400_BAD_REQUEST,
-                            )
         return self.create(request, *args, **kwargs)
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-        serialized_reservations = []
-        for reservation in queryset.all():
-            serializer = ReservationSerializer(reservation)
-
-            pet_rooms_list = []
-            for res_pet in reservation.reservation_pets.all():
-                pet_room = {
-                    "pet": res_pet.pet.name,
-                    "rooms_type_id": res_pet.room.room_type_id,
-                }
-                pet_rooms_list.append(pet_room)
-
-            services_list = []
-            for serv in reservation.reservation_services.all():
-                service = {"service": serv.service.name, "amount": serv.amount}
-                services_list.append(service)
-            reservation_dict = {
-                **serializer.data,
-                "pets_rooms": pet_rooms_list,
-                "services": services_list,
-            }
-            serialized_reservations.append(reservation_dict)
-        return Response(serialized_reservations)
+        page = self.paginate_queryset(queryset)
+        serializer = ReservationListSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     def get_queryset(self):
+        queryset = self.queryset.with_effective_status().prefetch_related(
+            Prefetch(
+                "reservation_pets",
+                queryset=ReservationPet.objects.select_related("pet").only(
+                    "reservation_id", "room_type_id", "price", "pet__name"
+                ),
+            ),
+            Prefetch(
+                "reservation_services",
+                queryset=ReservationService.objects.select_related("service").only(
+                    "reservation_id",
+                    "amount",
+                    "unit_price",
+                    "price",
+                    "service__name",
+                ),
+            ),
+        )
         if self.request.user.is_adm:
-            return self.queryset.all()
-        return self.queryset.filter(user=self.request.user)
+            return queryset
+        return queryset.filter(user=self.request.user)
 
 
 class ReservationDeleteView(APIView):
@@ -169,17 +126,60 @@ class ReservationDeleteView(APIView):
     permission_classes = [IsAdm | IsAccountOwner]
 
     def delete(self, request, reservation_id):
-        reservation = get_object_or_404(Reservation, id=reservation_id)
-
-        if reservation.status == "cancelled":
-            return Response(
-                {"detail": "You cannot delete a cancelled reservation."},
-                status.HTTP_400_BAD_REQUEST,
+        with transaction.atomic():
+            # o lock da linha impede que dois cancelamentos liberem os quartos duas vezes
+            reservation = get_object_or_404(
+                Reservation.objects.select_for_update(), id=reservation_id
             )
+            self.check_object_permissions(request, reservation)
 
-        reservation.status = "cancelled"
-        reservation.save()
+            if reservation.status == "cancelled":
+                return Response(
+                    {"detail": "You cannot delete a cancelled reservation."},
+                    status.HTTP_400_BAD_REQUEST,
+                )
 
-        self.check_object_permissions(request, reservation)
+            reservation.status = "cancelled"
+            reservation.save()
+            reservation.reservation_pets.update(is_cancelled=True)
+            release_rooms(reservation)
 
         return Response({}, status=status.HTTP_204_NO_CONTENT)
+
+
+class ReservationLocksView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdm]
+
+    def get(self, request):
+        return Response(get_lock_stats(), status=status.HTTP_200_OK)
+
+
+class ReservationExportView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdm]
+
+    columns = {
+        "id": "id",
+        "user_id": "user_id",
+        "status": "effective_status",
+        "checkin": "checkin",
+        "checkout": "checkout",
+        "rooms_total": "rooms_total",
+        "services_total": "services_total",
+        "total": "total",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+
+    def get(self, request):
+        export_format = get_export_format(request)
+        if export_format is None:
+            return Response(
+                {"message": "output must be one of csv, ndjson"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = Reservation.objects.with_effective_status().order_by(
+            "created_at", "id"
+        )
+        return export_response(queryset, self.columns, export_format, "reservations")
@@ -0,0 +1,24 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:04
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0002_alter_reviews_review_text"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reviews",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="reviews",
+            index=models.Index(fields=["created_at", "id"], name="review_created_idx"),
+        ),
+    ]
@@ -13,3 +13,7 @@ class Reviews(models.Model):
     user = models.ForeignKey(
         "users.User", on_delete=models.CASCADE, related_name="reviews"
     )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"], name="review_created_idx")]
@@ -12,7 +12,7 @@ class ReviewSerializer(serializers.Serializer):
     reservation = ReservationSerializer(read_only=True)
 
     def create(self, validated_data):
-        if validated_data["reservation"].status == "concluded":
+        if validated_data["reservation"].get_effective_status() == "concluded":
             review = Reviews.objects.create(**validated_data)
             return review
         else:
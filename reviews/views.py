@@ -8,6 +8,7 @@ from .permissions import IsAccountOwnerReview
 from django.shortcuts import get_object_or_404
 import ipdb
 from reservations.models import Reservation
+from _core.pagination import CreatedAtCursorPagination
 
 class ReviewView(generics.ListCreateAPIView):
     authentication_classes = [JWTAuthentication]
@@ -15,6 +16,7 @@ class ReviewView(generics.ListCreateAPIView):
 
     serializer_class = ReviewSerializer
     queryset = Reviews.objects.all()
+    pagination_class = CreatedAtCursorPagination
 
     def perform_create(self, serializer):
         # ipdb.set_trace()
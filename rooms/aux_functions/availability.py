@@ -1,7 +1,13 @@
-from django.shortcuts import get_object_or_404
-from rooms.models import Room, RoomType
+import hashlib
+from datetime import timedelta
+from django.http import Http404
+from django.db.models import Max, Min
+from rooms.models import Room
 from reservations.models import Reservation
-from .dates import are_dates_conflicting, get_dates_in_range
+from .dates import get_dates_in_range, get_next_month
+from .cache import get_occupancy_engine
+from .engine import OccupancyEngine
+from .registry import accepts_pet_type, is_shared, room_type_registry
 
 
 class RoomUnavailable(Exception):
@@ -13,21 +19,14 @@ def get_all_reservations_of_a_given_room_type(room_type_id):
     Returns a list of all reservations made for a particular room type,
     specified by the parameter. Does not include cancelled or concluded reservations.
     """
-    room_type = RoomType.objects.get(id=room_type_id)
-
-    # get all reservations that include the shared room::
-    all_reservations = Reservation.objects.filter(
-        status__in=["reserved", "active"]
-    ).all()
-
-    reservations_of_same_room_type = []
-    for res in all_reservations:
-        for res_pet in res.reservation_pets.all():
-            if res_pet.room.room_type == room_type:
-                reservations_of_same_room_type.append(res)
-                break
-
-    return reservations_of_same_room_type
+    return list(
+        Reservation.objects.with_effective_status()
+        .filter(
+            effective_status__in=["reserved", "active"],
+            reservation_pets__room_type_id=room_type_id,
+        )
+        .distinct()
+    )
 
 
 def get_all_reservations_dates_of_a_given_room_type(room_type_id):
@@ -42,94 +41,155 @@ def get_all_reservations_dates_of_a_given_room_type(room_type_id):
     return dates
 
 
-def get_shared_room_population(date):
+def get_reserved_date_range(room_type_id):
     """
-    Returns the number of pets occuppying the shared room in a give date,
-    specified by the parameter
+    Returns the earliest checkin and the latest checkout among the reservations made
+    for a particular room type, or (None, None) if there are none.
+    Does not include cancelled or concluded reservations.
     """
-    shared_room_type = RoomType.objects.get(title="Quarto Compartilhado")
-    shared_room = Room.objects.get(room_type=shared_room_type)
-    shared_room_reservations = get_all_reservations_of_a_given_room_type(
-        shared_room_type.id
+    dates = (
+        Reservation.objects.with_effective_status()
+        .filter(
+            effective_status__in=["reserved", "active"],
+            reservation_pets__room_type_id=room_type_id,
+        )
+        .aggregate(min_checkin=Min("checkin"), max_checkout=Max("checkout"))
     )
+    return dates["min_checkin"], dates["max_checkout"]
 
-    conflicting_reservations = [
-        res
-        for res in shared_room_reservations
-        if res.checkin <= date and res.checkout > date
-    ]
 
-    count = 0
-    for res in conflicting_reservations:
-        for res_pet in res.reservation_pets.all():
-            if res_pet.room == shared_room:
-                count += 1
-    return count
+def get_blocked_dates_by_month(room_type, months):
+    """
+    Returns a dict mapping the first day of each given month (ordered) to the dates
+    of that month in which the room type is full.
+    """
+    engine = get_occupancy_engine(months[0], get_next_month(months[-1]), [room_type.id])
+    return {
+        month: engine.get_blocked_dates(room_type, month, get_next_month(month))
+        for month in months
+    }
 
-def exists_available_room(date, room_type_id):
+
+def get_calendar_etag(room_type, month, blocked_dates):
     """
-    Returns true if there is at least one room of the desired type available in the desired date.
+    Returns the ETag of the calendar of a room type in a given month.
     """
-    room_type_reservations = get_all_reservations_of_a_given_room_type(room_type_id)
-    room_type_reservations_with_conflicting_date = [res for res in room_type_reservations if res.checkin <= date and res.checkout > date]
+    content = f"{room_type.id}:{month:%Y-%m}:{','.join(map(str, blocked_dates))}"
+    return f'"{hashlib.md5(content.encode()).hexdigest()}"'
+
 
+def get_room_types_availability(checkin, checkout, dogs=0, cats=0):
+    """
+    Returns, for every room type, how many pets it can still receive in the time window
+    between checkin and checkout. Private rooms report their free rooms, the shared room
+    reports its remaining capacity on the fullest night of the window.
+    A room type is available when it accepts the requested pets and can receive all of
+    them (or at least one pet, if no pets are requested).
+    Uses a bounded number of queries, regardless of the amount of reservations.
+    """
+    room_types = room_type_registry.get_all()
+    engine = get_occupancy_engine(
+        checkin, checkout, [room_type.id for room_type in room_types]
+    )
+    availability = []
+    for room_type in room_types:
+        if is_shared(room_type):
+            free_rooms = None
+            population = engine.get_max_population(room_type.id)
+            remaining_capacity = max(room_type.capacity - population, 0)
+        else:
+            free_rooms = len(engine.get_free_rooms(room_type.id, checkin, checkout))
+            remaining_capacity = free_rooms * room_type.capacity
+
+        pets = (dogs if accepts_pet_type(room_type, "dog") else 0) + (
+            cats if accepts_pet_type(room_type, "cat") else 0
+        )
+        if dogs + cats == 0:
+            available = remaining_capacity > 0
+        else:
+            available = 0 < pets <= remaining_capacity
+
+        availability.append(
+            {
+                "id": room_type.id,
+                "title": room_type.title,
+                "price": room_type.price,
+                "capacity": room_type.capacity,
+                "free_rooms": free_rooms,
+                "remaining_capacity": remaining_capacity,
+                "available": available,
+            }
+        )
+    return availability
 
-    if len(room_type_reservations_with_conflicting_date) >= 4: return False
 
-    amount_of_occupied_rooms = 0
-    for res in room_type_reservations_with_conflicting_date:
+def get_shared_room_population(date):
+    """
+    Returns the number of pets occuppying the shared room in a give date,
+    specified by the parameter
+    """
+    shared_room_types = room_type_registry.get_shared()
+    if not shared_room_types:
+        return 0
+    shared_room_type = shared_room_types[0]
+    engine = get_occupancy_engine(date, date + timedelta(1), [shared_room_type.id])
+    return engine.get_max_population(shared_room_type.id)
 
-        occupied_room_ids = []
-        for res_pet in res.reservation_pets.all():
-            if res_pet.room.room_type_id == room_type_id and res_pet.room.id not in occupied_room_ids:
-                occupied_room_ids.append(res_pet.room.id)   
-        amount_of_occupied_rooms += len(occupied_room_ids)
-    
-    return amount_of_occupied_rooms < 4
 
-def get_available_room(
-    checkin, checkout, room_type_id, current_reservation_pets
-) -> Room:
+def exists_available_room(date, room_type_id):
     """
-    Returns a room of a specific type (specified by room_type_id) which is available (has no reservations) in a given time window (specified by checkin and checkout).
-    If room_type_id refers to the shared room, the shared room will be returned if and only if it is operating below its full capacity (of 20 dogs) for all dates in the specified range.
+    Returns true if there is at least one room of the desired type available in the desired date.
     """
-    room_type = get_object_or_404(RoomType, id=room_type_id)
-    all_rooms = Room.objects.filter(room_type=room_type)
-    required_dates = get_dates_in_range(checkin, checkout)
+    engine = get_occupancy_engine(date, date + timedelta(1), [room_type_id])
+    return len(engine.get_free_rooms(room_type_id, date, date + timedelta(1))) > 0
 
-    if room_type.title == "Quarto Compartilhado":
-        for date in required_dates:
-            population = get_shared_room_population(date)
-            if population >= room_type.capacity:
-                raise RoomUnavailable(f"Shared room is full on {date}")
-        shared_room = all_rooms.first()
-        return shared_room
 
-    reservations_of_same_room_type = get_all_reservations_of_a_given_room_type(
-        room_type_id
-    )
-    conflicting_reservations = [
-        res
-        for res in reservations_of_same_room_type
-        if are_dates_conflicting(checkin, checkout, res.checkin, res.checkout)
-    ]
-    # quartos já ocupados NESSA reserva q está sendo criada
-    already_occupied_rooms_ids = [
-        res_pet.room.id for res_pet in current_reservation_pets
-    ]
-
-    ids_of_available_rooms = [
-        room.id for room in all_rooms if room.id not in already_occupied_rooms_ids
-    ]
-
-    # ultimo filtro para quartos possíveis: remover quartos q estão em conflicting_reservations
-    for reservation in conflicting_reservations:
-        for res_pet in reservation.reservation_pets.all():
-            if res_pet.room.id in ids_of_available_rooms:
-                idx = ids_of_available_rooms.index(res_pet.room.id)
-                ids_of_available_rooms.pop(idx)
-    if len(ids_of_available_rooms) == 0:
-        raise RoomUnavailable(f"No rooms of type '{room_type.title}' available")
-
-    return Room.objects.get(id=ids_of_available_rooms[0])
+def allocate_rooms(checkin, checkout, room_type_ids):
+    """
+    Given the room type requested for each pet of a reservation, returns the room where
+    each pet will stay, in the same order, for the time window between checkin and checkout.
+    Pets of the same private room type are packed together up to the room type capacity,
+    and the shared room must fit all of its pets on every night of the window.
+    Must be called under lock_room_types: the occupancy is read from the ledger in the
+    database, not from the occupancy cache, which may be stale in other processes.
+    The rooms and their nights are fetched once, whatever the amount of pets.
+    """
+    room_types = {
+        room_type_id: room_type_registry.get(room_type_id)
+        for room_type_id in set(room_type_ids)
+    }
+    if None in room_types.values():
+        raise Http404("No RoomType matches the given query.")
+
+    rooms_ids = [None] * len(room_type_ids)
+    engine = OccupancyEngine.load(checkin, checkout, sorted(room_types))
+
+    for room_type in room_types.values():
+        pets_idx = [
+            idx for idx, room_type_id in enumerate(room_type_ids)
+            if room_type_id == room_type.id
+        ]
+
+        if is_shared(room_type):
+            population = engine.get_population(room_type.id) + len(pets_idx)
+            full_dates = engine.get_dates(population > room_type.capacity)
+            shared_rooms_ids = engine.room_ids[engine.room_type_ids == room_type.id]
+            if len(shared_rooms_ids) == 0:
+                raise RoomUnavailable(f"No rooms of type '{room_type.title}' available")
+            if full_dates:
+                raise RoomUnavailable(f"Shared room is full on {full_dates[0]}")
+            for idx in pets_idx:
+                rooms_ids[idx] = int(shared_rooms_ids[0])
+            continue
+
+        free_rooms_ids = engine.get_free_rooms(room_type.id, checkin, checkout)
+        # cada quarto privativo recebe até `capacity` pets da reserva
+        pets_per_room = max(room_type.capacity, 1)
+        needed_rooms = -(-len(pets_idx) // pets_per_room)
+        if needed_rooms > len(free_rooms_ids):
+            raise RoomUnavailable(f"No rooms of type '{room_type.title}' available")
+        for position, idx in enumerate(pets_idx):
+            rooms_ids[idx] = free_rooms_ids[position // pets_per_room]
+
+    rooms = Room.objects.in_bulk(set(rooms_ids))
+    return [rooms[room_id] for room_id in rooms_ids]
@@ -0,0 +1,134 @@
+import numpy as np
+from django.core.cache import cache
+from .dates import get_months_in_range, get_next_month
+from .engine import OccupancyEngine
+
+CACHE_TIMEOUT = 60 * 60 * 24
+HITS_KEY = "occupancy:hits"
+MISSES_KEY = "occupancy:misses"
+
+
+def get_version_key(room_type_id):
+    return f"occupancy:version:{room_type_id}"
+
+
+def get_month_key(room_type_id, version, month):
+    return f"occupancy:{room_type_id}:{version}:{month:%Y-%m}"
+
+
+def get_versions(room_type_ids):
+    keys = {room_type_id: get_version_key(room_type_id) for room_type_id in room_type_ids}
+    versions = cache.get_many(keys.values())
+    return {room_type_id: versions.get(key, 0) for room_type_id, key in keys.items()}
+
+
+def count_lookups(hits, misses):
+    for key, amount in ((HITS_KEY, hits), (MISSES_KEY, misses)):
+        if amount:
+            cache.add(key, 0, None)
+            cache.incr(key, amount)
+
+
+def get_cache_stats():
+    """
+    Returns the hit and miss counters of the occupancy cache.
+    """
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / lookups if lookups else None,
+    }
+
+
+def get_occupancy_engine(start, end, room_type_ids):
+    """
+    Returns an OccupancyEngine between start (inclusive) and end (exclusive) for the given
+    room types, read through the cache. The occupancy of each (room type, month) pair is
+    cached on its own, and the missing pairs are loaded together with one OccupancyEngine.load.
+    """
+    # sem tipos de quarto não há o que concatenar: o engine fica sem quartos
+    if not room_type_ids:
+        return OccupancyEngine.from_stays(start, end, [], [])
+
+    months = get_months_in_range(start, end)
+    if not months:
+        return OccupancyEngine.load(start, end, room_type_ids)
+
+    versions = get_versions(room_type_ids)
+    keys = {
+        (room_type_id, month): get_month_key(room_type_id, versions[room_type_id], month)
+        for room_type_id in room_type_ids
+        for month in months
+    }
+    cached_months = cache.get_many(keys.values())
+    missing = [pair for pair, key in keys.items() if key not in cached_months]
+    count_lookups(hits=len(keys) - len(missing), misses=len(missing))
+
+    if missing:
+        first_month = min(month for _, month in missing)
+        last_month = max(month for _, month in missing)
+        engine = OccupancyEngine.load(
+            first_month,
+            get_next_month(last_month),
+            sorted({room_type_id for room_type_id, _ in missing}),
+        )
+        loaded_months = {}
+        for room_type_id, month in missing:
+            rows = engine.room_type_ids == room_type_id
+            nights = slice(
+                (month - first_month).days, (get_next_month(month) - first_month).days
+            )
+            loaded_months[keys[(room_type_id, month)]] = (
+                engine.room_ids[rows],
+                engine.pets[rows, nights],
+            )
+        # também os meses passados expiram: num cache local, como o LocMemCache, as
+        # invalidações feitas em outro processo (importação, cancelamentos) não chegam
+        # aqui e o timeout é o que limita a defasagem
+        cache.set_many(loaded_months, CACHE_TIMEOUT)
+        cached_months.update(loaded_months)
+
+    room_ids = []
+    types = []
+    pets = []
+    for room_type_id in room_type_ids:
+        type_months = [cached_months[keys[(room_type_id, month)]] for month in months]
+        type_room_ids = type_months[0][0]
+        room_ids.append(type_room_ids)
+        types.append(np.full(len(type_room_ids), room_type_id, dtype=np.int64))
+        pets.append(np.concatenate([month_pets for _, month_pets in type_months], axis=1))
+
+    nights = slice((start - months[0]).days, (end - months[0]).days)
+    return OccupancyEngine(
+        start,
+        np.concatenate(room_ids),
+        np.concatenate(types),
+        np.concatenate(pets, axis=0)[:, nights],
+    )
+
+
+def invalidate_occupancy(room_type_ids, checkin, checkout):
+    """
+    Drops the cached months touched by a stay between checkin and checkout in the given room types.
+    """
+    versions = get_versions(room_type_ids)
+    cache.delete_many(
+        [
+            get_month_key(room_type_id, versions[room_type_id], month)
+            for room_type_id in room_type_ids
+            for month in get_months_in_range(checkin, checkout)
+        ]
+    )
+
+
+def invalidate_room_type(room_type_id):
+    """
+    Drops every cached month of a room type, used when its rooms change.
+    """
+    key = get_version_key(room_type_id)
+    cache.add(key, 0, None)
+    cache.incr(key)
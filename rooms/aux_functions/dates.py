@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List
 
 def get_min_and_max_dates(reservations):
@@ -51,3 +51,42 @@ def are_dates_conflicting(
         or (checkin2 >= checkin1 and checkin2 < checkout1)
         or (checkin2 <= checkin1 and checkout2 >= checkout1)
     )
+
+
+def get_months_in_range(min_date: datetime, max_date: datetime) -> List[datetime]:
+    """
+    Returns the first day of every month touched by the range starting on minDate (inclusive) and ending on maxDate (exclusive)
+
+    Example:
+
+    get_months_in_range('2010-01-20', '2010-03-01')
+    returns:
+    ['2010-01-01', '2010-02-01']
+    """
+    months = []
+    curr_month = min_date.replace(day=1)
+    while curr_month < max_date:
+        months.append(curr_month)
+        curr_month = get_next_month(curr_month)
+    return months
+
+
+def get_next_month(date: datetime) -> datetime:
+    """
+    Returns the first day of the month after the given date.
+    """
+    if date.month == 12:
+        return date.replace(year=date.year + 1, month=1, day=1)
+    return date.replace(month=date.month + 1, day=1)
+
+
+# primeiro dia do último mês representável: o mês seguinte a ele não existe
+LAST_MONTH = date.max.replace(day=1)
+
+
+def has_next_month(date: datetime) -> bool:
+    """
+    Returns true if get_next_month can be called with the given date, which is false
+    only on the last month representable by date.
+    """
+    return date < LAST_MONTH
@@ -0,0 +1,138 @@
+from datetime import timedelta
+import numpy as np
+from rooms.models import Room, RoomOccupancy
+from .registry import is_shared
+
+
+class OccupancyEngine:
+    """
+    Occupancy of every room night by night, starting on the start date.
+    pets is a rooms x nights int array holding the number of pets in each room,
+    whose rows match the room_ids and room_type_ids arrays, so calendar and
+    availability questions are answered with vectorized operations instead of
+    loops over dates.
+    """
+
+    def __init__(self, start, room_ids, room_type_ids, pets):
+        self.start = start
+        self.end = start + timedelta(pets.shape[1])
+        self.room_ids = room_ids
+        self.room_type_ids = room_type_ids
+        self.pets = pets
+
+    @classmethod
+    def load(cls, start, end, room_type_ids=None):
+        """
+        Loads the occupancy ledger between start (inclusive) and end (exclusive) with a
+        single query. If room_type_ids is given, only rooms of those types are loaded.
+        """
+        rooms = Room.objects.order_by("id")
+        entries = RoomOccupancy.objects.filter(date__gte=start, date__lt=end)
+        if room_type_ids is not None:
+            rooms = rooms.filter(room_type_id__in=room_type_ids)
+            entries = entries.filter(room_type_id__in=room_type_ids)
+
+        rooms = list(rooms.values_list("id", "room_type_id"))
+        pets = np.zeros((len(rooms), max((end - start).days, 0)), dtype=np.int32)
+
+        entries = list(entries.values_list("room_id", "date", "occupied"))
+        if entries:
+            row_by_room = {room_id: row for row, (room_id, _) in enumerate(rooms)}
+            rows = np.array([row_by_room[room_id] for room_id, _, _ in entries])
+            nights = np.array([(date - start).days for _, date, _ in entries])
+            pets[rows, nights] = [occupied for _, _, occupied in entries]
+
+        return cls(
+            start,
+            np.array([room_id for room_id, _ in rooms], dtype=np.int64),
+            np.array([room_type_id for _, room_type_id in rooms], dtype=np.int64),
+            pets,
+        )
+
+    @classmethod
+    def from_stays(cls, start, end, rooms, stays):
+        """
+        Builds the occupancy between start (inclusive) and end (exclusive) straight from
+        the stays, without the ledger. rooms is a list of (room_id, room_type_id) pairs and
+        stays an iterable of (room_id, checkin, checkout), each one counting as one pet.
+        Every stay adds 1 on its checkin and -1 on its checkout in a difference array,
+        whose running sum over the nights gives the pets in each room.
+        """
+        row_by_room = {room_id: row for row, (room_id, _) in enumerate(rooms)}
+        nights = max((end - start).days, 0)
+        stays = list(stays)
+
+        differences = np.zeros((len(rooms), nights + 1), dtype=np.int32)
+        if stays:
+            rows = np.array([row_by_room[room_id] for room_id, _, _ in stays])
+            checkins = np.array([(checkin - start).days for _, checkin, _ in stays])
+            checkouts = np.array([(checkout - start).days for _, _, checkout in stays])
+            np.add.at(differences, (rows, np.clip(checkins, 0, nights)), 1)
+            np.add.at(differences, (rows, np.clip(checkouts, 0, nights)), -1)
+
+        return cls(
+            start,
+            np.array([room_id for room_id, _ in rooms], dtype=np.int64),
+            np.array([room_type_id for _, room_type_id in rooms], dtype=np.int64),
+            np.cumsum(differences, axis=1)[:, :nights].astype(np.int32),
+        )
+
+    def _get_nights(self, checkin=None, checkout=None):
+        first = 0 if checkin is None else max((checkin - self.start).days, 0)
+        last = self.pets.shape[1] if checkout is None else (checkout - self.start).days
+        return slice(first, max(last, first))
+
+    def get_dates(self, nights_mask):
+        """
+        Converts a boolean array over the nights of the engine into a list of dates.
+        """
+        return [self.start + timedelta(int(night)) for night in np.flatnonzero(nights_mask)]
+
+    def get_population(self, room_type_id):
+        """
+        Returns an array with the number of pets in rooms of the given type on each night.
+        """
+        return self.pets[self.room_type_ids == room_type_id].sum(axis=0)
+
+    def get_max_population(self, room_type_id, checkin=None, checkout=None):
+        """
+        Returns the largest number of pets in rooms of the given type on a single night,
+        optionally restricted to the window between checkin and checkout.
+        """
+        population = self.get_population(room_type_id)[self._get_nights(checkin, checkout)]
+        return int(population.max()) if population.size else 0
+
+    def get_occupied_rooms(self, room_type_id):
+        """
+        Returns an array with the number of occupied rooms of the given type on each night.
+        """
+        return (self.pets[self.room_type_ids == room_type_id] > 0).sum(axis=0)
+
+    def get_full_nights(self, room_type):
+        """
+        Returns a boolean array telling on which nights no more pets can be booked in the
+        given room type. The shared room is full when its population reaches the room type
+        capacity, private rooms are full when every room of the type is occupied.
+        """
+        if is_shared(room_type):
+            return self.get_population(room_type.id) >= room_type.capacity
+        amount_of_rooms = np.count_nonzero(self.room_type_ids == room_type.id)
+        return self.get_occupied_rooms(room_type.id) >= amount_of_rooms
+
+    def get_blocked_dates(self, room_type, checkin=None, checkout=None):
+        """
+        Returns the dates in which the given room type is full, ordered by date,
+        optionally restricted to the window between checkin and checkout.
+        """
+        in_window = np.zeros(self.pets.shape[1], dtype=bool)
+        in_window[self._get_nights(checkin, checkout)] = True
+        return self.get_dates(self.get_full_nights(room_type) & in_window)
+
+    def get_free_rooms(self, room_type_id, checkin, checkout):
+        """
+        Returns the ids of the rooms of a given type with no pets on every night
+        between checkin (inclusive) and checkout (exclusive), ordered by id.
+        """
+        rows = self.room_type_ids == room_type_id
+        window = self.pets[rows][:, self._get_nights(checkin, checkout)]
+        return self.room_ids[rows][~window.any(axis=1)].tolist()
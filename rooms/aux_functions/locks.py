@@ -0,0 +1,108 @@
+import threading
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+from django.core.cache import cache
+from django.db import connection, transaction
+
+# primeiro argumento de pg_advisory_xact_lock, separa os locks de reserva de outros usos
+BOOKING_LOCK_NAMESPACE = 4242
+ACQUISITIONS_KEY = "booking_lock:acquisitions"
+WAITS_KEY = "booking_lock:waits"
+WAIT_TIME_KEY = "booking_lock:wait_us"
+MAX_WAIT_KEY = "booking_lock:max_wait_us"
+
+process_locks = {}
+process_locks_guard = threading.Lock()
+
+
+def get_process_lock(room_type_id):
+    with process_locks_guard:
+        return process_locks.setdefault(room_type_id, threading.Lock())
+
+
+def increment_counter(key, amount=1):
+    cache.add(key, 0, None)
+    cache.incr(key, amount)
+
+
+def record_lock_wait(seconds):
+    microseconds = int(seconds * 1000000)
+    increment_counter(WAITS_KEY)
+    increment_counter(WAIT_TIME_KEY, microseconds)
+    if microseconds > cache.get(MAX_WAIT_KEY, 0):
+        cache.set(MAX_WAIT_KEY, microseconds, None)
+
+
+def acquire_process_lock(room_type_id):
+    """
+    Takes the process lock of a room type, returning true if it had to wait for it.
+    """
+    lock = get_process_lock(room_type_id)
+    if lock.acquire(blocking=False):
+        return False
+    lock.acquire()
+    return True
+
+
+def acquire_advisory_lock(cursor, room_type_id):
+    """
+    Takes the advisory lock of a room type, returning true if it had to wait for it.
+    """
+    cursor.execute(
+        "SELECT pg_try_advisory_xact_lock(%s, %s)", [BOOKING_LOCK_NAMESPACE, room_type_id]
+    )
+    if cursor.fetchone()[0]:
+        return False
+    cursor.execute(
+        "SELECT pg_advisory_xact_lock(%s, %s)", [BOOKING_LOCK_NAMESPACE, room_type_id]
+    )
+    return True
+
+
+def get_lock_stats():
+    """
+    Returns how many bookings took the room type locks, how many of them found a lock
+    taken by another booking and how long those waited for it.
+    """
+    counters = cache.get_many([ACQUISITIONS_KEY, WAITS_KEY, WAIT_TIME_KEY, MAX_WAIT_KEY])
+    waits = counters.get(WAITS_KEY, 0)
+    wait_time = counters.get(WAIT_TIME_KEY, 0) / 1000
+    return {
+        "acquisitions": counters.get(ACQUISITIONS_KEY, 0),
+        "waits": waits,
+        "total_wait_ms": wait_time,
+        "average_wait_ms": wait_time / waits if waits else None,
+        "max_wait_ms": counters.get(MAX_WAIT_KEY, 0) / 1000,
+    }
+
+
+@contextmanager
+def lock_room_types(room_type_ids):
+    """
+    Opens a transaction holding an exclusive lock on each of the given room types, so two
+    bookings of the same room type allocate and insert their rooms one after the other while
+    bookings of other room types go on. The locks are taken in id order to avoid deadlocks
+    and released when the transaction ends.
+
+    On PostgreSQL they are transaction-level advisory locks. Other databases fall back to a
+    lock per room type inside the process, which is enough for SQLite since it already
+    serializes writes between processes but not the reads done before them.
+    """
+    room_type_ids = sorted(set(room_type_ids))
+    waited = False
+    with ExitStack() as stack:
+        start = perf_counter()
+        if connection.vendor != "postgresql":
+            for room_type_id in room_type_ids:
+                waited = acquire_process_lock(room_type_id) or waited
+                stack.callback(get_process_lock(room_type_id).release)
+        stack.enter_context(transaction.atomic())
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                for room_type_id in room_type_ids:
+                    waited = acquire_advisory_lock(cursor, room_type_id) or waited
+        increment_counter(ACQUISITIONS_KEY)
+        # só conta como espera quando outra reserva segurava um dos locks
+        if waited:
+            record_lock_wait(perf_counter() - start)
+        yield
@@ -0,0 +1,192 @@
+from collections import Counter
+from datetime import timedelta
+import numpy as np
+from django.db.models import Q
+from rooms.models import RoomOccupancy
+from reservations.models import ReservationPet
+from .dates import get_dates_in_range
+from .engine import OccupancyEngine
+
+
+def occupy_rooms(reservation_pets, checkin, checkout):
+    """
+    Adds the nights of the given reservation pets to the occupancy ledger.
+    Must be called inside the transaction that books the rooms.
+    """
+    stays = [(res_pet.room_id, res_pet.room_type_id) for res_pet in reservation_pets]
+    update_ledger(stays, checkin, checkout, 1)
+
+
+def release_rooms(reservation):
+    """
+    Removes the nights of a reservation from the occupancy ledger.
+    Must be called inside the transaction that cancels the reservation.
+    """
+    stays = reservation.reservation_pets.values_list("room_id", "room_type_id")
+    update_ledger(list(stays), reservation.checkin, reservation.checkout, -1)
+
+
+def update_ledger(stays, checkin, checkout, sign):
+    """
+    Applies a list of (room_id, room_type_id) stays to every night between checkin
+    (inclusive) and checkout (exclusive). Each stay counts as one pet in the room;
+    sign is 1 to book the nights and -1 to release them.
+    """
+    pets_per_room = Counter(room_id for room_id, _ in stays)
+    room_types = dict(stays)
+    nights = get_dates_in_range(checkin, checkout)
+
+    existing_entries = {
+        (entry.room_id, entry.date): entry
+        for entry in RoomOccupancy.objects.select_for_update().filter(
+            room_id__in=pets_per_room, date__gte=checkin, date__lt=checkout
+        )
+    }
+
+    entries_to_create = []
+    entries_to_update = []
+    ids_to_delete = []
+    for room_id, pets in pets_per_room.items():
+        for night in nights:
+            entry = existing_entries.get((room_id, night))
+            if entry is None:
+                if sign > 0:
+                    entries_to_create.append(
+                        RoomOccupancy(
+                            room_id=room_id,
+                            room_type_id=room_types[room_id],
+                            date=night,
+                            occupied=pets,
+                        )
+                    )
+                continue
+            entry.occupied += sign * pets
+            if entry.occupied > 0:
+                entries_to_update.append(entry)
+            else:
+                ids_to_delete.append(entry.id)
+
+    RoomOccupancy.objects.bulk_create(entries_to_create)
+    RoomOccupancy.objects.bulk_update(entries_to_update, ["occupied"])
+    RoomOccupancy.objects.filter(id__in=ids_to_delete).delete()
+
+
+def occupy_stays(stays, batch_size=1000):
+    """
+    Adds a list of (room_id, room_type_id, checkin, checkout) stays, each one counting
+    as one pet, to the occupancy ledger, whatever their windows: the ledger rows of
+    each room are locked and read with one query and written in bulk.
+    Must be called inside the transaction that writes the stays, holding the locks
+    of their room types.
+    """
+    pets_per_night = Counter()
+    room_types = {}
+    windows = {}
+    for room_id, room_type_id, checkin, checkout in stays:
+        room_types[room_id] = room_type_id
+        first, last = windows.get(room_id, (checkin, checkout))
+        windows[room_id] = (min(first, checkin), max(last, checkout))
+        for night in get_dates_in_range(checkin, checkout):
+            pets_per_night[(room_id, night)] += 1
+    if not pets_per_night:
+        return
+
+    # só as noites entre a primeira e a última estadia de cada quarto
+    in_windows = Q()
+    for room_id, (first, last) in windows.items():
+        in_windows |= Q(room_id=room_id, date__gte=first, date__lt=last)
+    existing_entries = {
+        (entry.room_id, entry.date): entry
+        for entry in RoomOccupancy.objects.select_for_update().filter(in_windows)
+    }
+
+    entries_to_create = []
+    entries_to_update = []
+    for (room_id, night), pets in pets_per_night.items():
+        entry = existing_entries.get((room_id, night))
+        if entry is None:
+            entries_to_create.append(
+                RoomOccupancy(
+                    room_id=room_id,
+                    room_type_id=room_types[room_id],
+                    date=night,
+                    occupied=pets,
+                )
+            )
+        else:
+            entry.occupied += pets
+            entries_to_update.append(entry)
+
+    RoomOccupancy.objects.bulk_create(entries_to_create, batch_size=batch_size)
+    RoomOccupancy.objects.bulk_update(entries_to_update, ["occupied"], batch_size=batch_size)
+
+
+def get_expected_occupancy():
+    """
+    Recomputes the ledger from the raw reservations. Returns a dict mapping
+    (room_id, date) to a (room_type_id, occupied) pair.
+    Cancelled reservations do not occupy rooms.
+    """
+    stays = list(
+        ReservationPet.objects.filter(is_cancelled=False, checkin__isnull=False)
+        .values_list("room_id", "room_type_id", "checkin", "checkout")
+    )
+    if not stays:
+        return {}
+
+    rooms = sorted({(room_id, room_type_id) for room_id, room_type_id, _, _ in stays})
+    engine = OccupancyEngine.from_stays(
+        min(checkin for _, _, checkin, _ in stays),
+        max(checkout for _, _, _, checkout in stays),
+        rooms,
+        [(room_id, checkin, checkout) for room_id, _, checkin, checkout in stays],
+    )
+
+    expected = {}
+    for row, night in zip(*np.nonzero(engine.pets)):
+        expected[(int(engine.room_ids[row]), engine.start + timedelta(int(night)))] = (
+            int(engine.room_type_ids[row]),
+            int(engine.pets[row, night]),
+        )
+    return expected
+
+
+def get_occupancy_drift():
+    """
+    Compares the ledger against the raw reservations. Returns a list of
+    (room_id, date, ledger_count, expected_count) for every night that differs.
+    """
+    expected = get_expected_occupancy()
+    actual = {
+        (room_id, date): occupied
+        for room_id, date, occupied in RoomOccupancy.objects.values_list(
+            "room_id", "date", "occupied"
+        ).iterator()
+    }
+
+    drift = []
+    for key in sorted(set(expected) | set(actual)):
+        expected_count = expected.get(key, (None, 0))[1]
+        ledger_count = actual.get(key, 0)
+        if expected_count != ledger_count:
+            drift.append((*key, ledger_count, expected_count))
+    return drift
+
+
+def rebuild_occupancy(batch_size=1000):
+    """
+    Replaces the whole ledger with the nights recomputed from the raw reservations.
+    Must be called inside a transaction. Returns the number of ledger rows written.
+    """
+    expected = get_expected_occupancy()
+    RoomOccupancy.objects.all().delete()
+    RoomOccupancy.objects.bulk_create(
+        [
+            RoomOccupancy(
+                room_id=room_id, room_type_id=room_type_id, date=date, occupied=occupied
+            )
+            for (room_id, date), (room_type_id, occupied) in expected.items()
+        ],
+        batch_size=batch_size,
+    )
+    return len(expected)
@@ -0,0 +1,82 @@
+from time import monotonic
+from django.core.cache import cache
+from rooms.models import RoomKindChoices, RoomType
+
+VERSION_KEY = "room_types:version"
+# limite para uma cópia desatualizada se o cache não for compartilhado entre processos
+REGISTRY_TIMEOUT = 60
+
+PET_TYPES_BY_KIND = {
+    RoomKindChoices.SHARED: {"dog"},
+    RoomKindChoices.DOGS: {"dog"},
+    RoomKindChoices.CATS: {"cat"},
+}
+
+
+class RoomTypeRegistry:
+    """
+    In-process copy of every room type, loaded with one query on the first lookup.
+    Each process keeps its own copy, tagged with a version kept in the Django cache.
+    The room type signals (see rooms/signals.py) bump the version, so every process
+    loads the room types again on its next lookup; copies older than REGISTRY_TIMEOUT
+    seconds are also loaded again, in case the cache is not shared between processes.
+    The room types returned are shared between requests and must not be changed.
+    """
+
+    def __init__(self):
+        self._room_types = None
+        self._version = None
+        self._loaded_at = None
+
+    def invalidate(self):
+        self._room_types = None
+        cache.add(VERSION_KEY, 0, None)
+        cache.incr(VERSION_KEY)
+
+    def load(self, version):
+        self._room_types = RoomType.objects.in_bulk()
+        self._version = version
+        self._loaded_at = monotonic()
+
+    def get_room_types(self):
+        version = cache.get(VERSION_KEY, 0)
+        if (
+            self._room_types is None
+            or version != self._version
+            or monotonic() - self._loaded_at > REGISTRY_TIMEOUT
+        ):
+            self.load(version)
+        return self._room_types
+
+    def get_all(self):
+        """
+        Returns every room type, ordered by id.
+        """
+        room_types = self.get_room_types()
+        return [room_types[room_type_id] for room_type_id in sorted(room_types)]
+
+    def get(self, room_type_id):
+        """
+        Returns the room type with the given id, or None if there is no such room type.
+        """
+        return self.get_room_types().get(int(room_type_id))
+
+    def get_shared(self):
+        """
+        Returns the shared room types, ordered by id.
+        """
+        return [room_type for room_type in self.get_all() if is_shared(room_type)]
+
+
+def is_shared(room_type):
+    return room_type.kind == RoomKindChoices.SHARED
+
+
+def accepts_pet_type(room_type, pet_type):
+    """
+    Returns true if pets of the given type ("dog" or "cat") can stay in the room type.
+    """
+    return pet_type in PET_TYPES_BY_KIND[room_type.kind]
+
+
+room_type_registry = RoomTypeRegistry()
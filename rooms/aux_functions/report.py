@@ -0,0 +1,44 @@
+from datetime import timedelta
+import numpy as np
+from .cache import get_occupancy_engine
+from .registry import is_shared, room_type_registry
+
+
+def get_occupancy_report(start, end):
+    """
+    Returns, for every room type, the occupied and total counts of each night between
+    start (inclusive) and end (exclusive). Private room types count rooms, the rooms with
+    pets over the rooms of the type; the shared room type counts pets, the pets staying
+    over the capacity of the type.
+    Reads the occupancy of all room types at once through the month cache, so past
+    months come from the cache and the counts are vectorized over the nights.
+    """
+    room_types = room_type_registry.get_all()
+    engine = get_occupancy_engine(start, end, [room_type.id for room_type in room_types])
+    dates = [
+        (engine.start + timedelta(night)).isoformat()
+        for night in range(engine.pets.shape[1])
+    ]
+
+    report = []
+    for room_type in room_types:
+        if is_shared(room_type):
+            unit = "pets"
+            occupied = engine.get_population(room_type.id)
+            total = room_type.capacity
+        else:
+            unit = "rooms"
+            occupied = engine.get_occupied_rooms(room_type.id)
+            total = int(np.count_nonzero(engine.room_type_ids == room_type.id))
+        report.append(
+            {
+                "room_type_id": room_type.id,
+                "title": room_type.title,
+                "unit": unit,
+                "nights": [
+                    {"date": night, "occupied": count, "total": total}
+                    for night, count in zip(dates, occupied.tolist())
+                ],
+            }
+        )
+    return report
@@ -0,0 +1,86 @@
+import random
+from datetime import date, timedelta
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from rooms.aux_functions.dates import are_dates_conflicting
+from rooms.aux_functions.engine import OccupancyEngine
+
+
+def get_free_rooms_by_scan(rooms, stays, room_type_id, checkin, checkout):
+    """
+    Original room lookup of the reservations: checks every stay of the room type
+    against the window and removes the conflicting rooms one by one.
+    """
+    room_types = {room_id: type_id for type_id, room_id in rooms}
+    ids_of_available_rooms = [
+        room_id for type_id, room_id in rooms if type_id == room_type_id
+    ]
+    for room_id, stay_checkin, stay_checkout in stays:
+        if room_types[room_id] != room_type_id:
+            continue
+        if are_dates_conflicting(checkin, checkout, stay_checkin, stay_checkout):
+            if room_id in ids_of_available_rooms:
+                idx = ids_of_available_rooms.index(room_id)
+                ids_of_available_rooms.pop(idx)
+    return ids_of_available_rooms
+
+
+class Command(BaseCommand):
+    help = "Compares the occupancy engine against a full scan of the reservations, in memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reservations", type=int, default=10000)
+        parser.add_argument("--rooms", type=int, default=20)
+        parser.add_argument("--queries", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        generator = random.Random(options["seed"])
+        rooms = [(1, room_id) for room_id in range(1, options["rooms"] + 1)]
+
+        # estadias sem sobreposição dentro de cada quarto, como num quarto privativo
+        first_day = date(2023, 1, 1)
+        next_free_day = {room_id: first_day for _, room_id in rooms}
+        stays = []
+        for _ in range(options["reservations"]):
+            room_id = generator.choice(rooms)[1]
+            checkin = next_free_day[room_id] + timedelta(generator.randint(0, 3))
+            checkout = checkin + timedelta(generator.randint(1, 7))
+            next_free_day[room_id] = checkout
+            stays.append((room_id, checkin, checkout))
+
+        last_day = max(next_free_day.values())
+        windows = []
+        for _ in range(options["queries"]):
+            checkin = first_day + timedelta(generator.randint(0, (last_day - first_day).days))
+            windows.append((checkin, checkin + timedelta(generator.randint(1, 7))))
+
+        # o mesmo engine que a alocação de quartos lê do ledger, montado das estadias
+        start = perf_counter()
+        engine = OccupancyEngine.from_stays(
+            first_day,
+            max(checkout for _, checkout in windows),
+            [(room_id, type_id) for type_id, room_id in rooms],
+            stays,
+        )
+        build_time = perf_counter() - start
+
+        start = perf_counter()
+        engine_results = [engine.get_free_rooms(1, *window) for window in windows]
+        engine_time = perf_counter() - start
+
+        start = perf_counter()
+        scan_results = [
+            sorted(get_free_rooms_by_scan(rooms, stays, 1, *window)) for window in windows
+        ]
+        scan_time = perf_counter() - start
+
+        if engine_results != scan_results:
+            self.stderr.write("Occupancy engine and full scan disagree")
+
+        self.stdout.write(
+            f"{len(stays)} stays, {len(rooms)} rooms, {len(windows)} queries\n"
+            f"engine build: {build_time * 1000:.1f} ms\n"
+            f"engine lookups: {engine_time * 1000:.1f} ms\n"
+            f"full scan lookups: {scan_time * 1000:.1f} ms"
+        )
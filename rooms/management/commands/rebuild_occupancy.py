@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rooms.aux_functions.occupancy import get_occupancy_drift, rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the room occupancy ledger from the reservations, or verifies it with --check."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report nights where the ledger differs from the reservations.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            drift = get_occupancy_drift()
+            for room_id, date, ledger_count, expected_count in drift:
+                self.stdout.write(
+                    f"Room {room_id} on {date}: ledger has {ledger_count}, reservations have {expected_count}"
+                )
+            if drift:
+                raise CommandError(f"Occupancy ledger drifted on {len(drift)} nights")
+            self.stdout.write(self.style.SUCCESS("Occupancy ledger is consistent"))
+            return
+
+        with transaction.atomic():
+            rows = rebuild_occupancy()
+        self.stdout.write(self.style.SUCCESS(f"Occupancy ledger rebuilt with {rows} nights"))
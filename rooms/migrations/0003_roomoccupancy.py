@@ -0,0 +1,58 @@
+# Generated by Django 4.1.5 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0002_auto_20230105_1850"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RoomOccupancy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("occupied", models.IntegerField(default=0)),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy",
+                        to="rooms.room",
+                    ),
+                ),
+                (
+                    "room_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy",
+                        to="rooms.roomtype",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="roomoccupancy",
+            index=models.Index(
+                fields=["room_type", "date"], name="occupancy_type_date_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="roomoccupancy",
+            constraint=models.UniqueConstraint(
+                fields=("room", "date"), name="unique_room_night"
+            ),
+        ),
+    ]
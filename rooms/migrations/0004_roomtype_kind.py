@@ -0,0 +1,29 @@
+# Generated by Django 4.1.5 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+def set_kinds(apps, schema_editor):
+    RoomType = apps.get_model("rooms", "RoomType")
+    RoomType.objects.filter(title__icontains="Compartilhado").update(kind="shared")
+    RoomType.objects.filter(title__icontains="gatos").update(kind="cats")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0003_roomoccupancy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="roomtype",
+            name="kind",
+            field=models.CharField(
+                choices=[("shared", "Shared"), ("dogs", "Dogs"), ("cats", "Cats")],
+                default="dogs",
+                max_length=6,
+            ),
+        ),
+        migrations.RunPython(set_kinds, migrations.RunPython.noop),
+    ]
@@ -2,12 +2,21 @@ from django.db import models
 import uuid
 
 
+class RoomKindChoices(models.TextChoices):
+    SHARED = "shared"
+    DOGS = "dogs"
+    CATS = "cats"
+
+
 class RoomType(models.Model):
     title = models.CharField(max_length=25, unique=True)
     description = models.CharField(max_length=150)
     image = models.CharField(max_length=250)
     capacity = models.IntegerField()
     price = models.DecimalField(max_digits=8, decimal_places=2)
+    kind = models.CharField(
+        max_length=6, choices=RoomKindChoices.choices, default=RoomKindChoices.DOGS
+    )
 
     def __repr__(self) -> str:
         return f"RoomType [{self.id}] - {self.title}"
@@ -18,3 +27,25 @@ class Room(models.Model):
 
     def __repr__(self) -> str:
         return f"Room [{self.id}]"
+
+
+class RoomOccupancy(models.Model):
+    room = models.ForeignKey(
+        "rooms.Room", on_delete=models.CASCADE, related_name="occupancy"
+    )
+    room_type = models.ForeignKey(
+        "rooms.RoomType", on_delete=models.CASCADE, related_name="occupancy"
+    )
+    date = models.DateField()
+    occupied = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["room", "date"], name="unique_room_night")
+        ]
+        indexes = [
+            models.Index(fields=["room_type", "date"], name="occupancy_type_date_idx")
+        ]
+
+    def __repr__(self) -> str:
+        return f"RoomOccupancy [{self.room_id}] - {self.date}: {self.occupied}"
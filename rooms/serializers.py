@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Room, RoomType
 from django.shortcuts import get_object_or_404
+from .aux_functions.dates import get_months_in_range, has_next_month
 import ipdb
 
 
@@ -26,4 +27,65 @@ class Room_TypeSerializer(serializers.ModelSerializer):
             "image",
             "capacity",
             "price",
+            "kind",
         ]
+
+
+def validate_supported_date(value):
+    if not has_next_month(value):
+        raise serializers.ValidationError("Date is out of the supported range")
+    return value
+
+
+MAX_SEARCH_NIGHTS = 365
+
+
+class AvailabilitySearchSerializer(serializers.Serializer):
+    checkin = serializers.DateField(validators=[validate_supported_date])
+    checkout = serializers.DateField(validators=[validate_supported_date])
+    dogs = serializers.IntegerField(min_value=0, default=0)
+    cats = serializers.IntegerField(min_value=0, default=0)
+
+    def validate(self, attrs):
+        if attrs["checkin"] >= attrs["checkout"]:
+            raise serializers.ValidationError(
+                {"checkin": "Checkout date must be after checkin"}
+            )
+        if (attrs["checkout"] - attrs["checkin"]).days > MAX_SEARCH_NIGHTS:
+            raise serializers.ValidationError(
+                {"checkout": f"Stay cannot be longer than {MAX_SEARCH_NIGHTS} nights"}
+            )
+        return attrs
+
+
+class RoomTypeAvailabilitySerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    price = serializers.DecimalField(max_digits=8, decimal_places=2)
+    capacity = serializers.IntegerField()
+    free_rooms = serializers.IntegerField(allow_null=True)
+    remaining_capacity = serializers.IntegerField()
+    available = serializers.BooleanField()
+
+
+MAX_CALENDAR_MONTHS = 12
+
+
+class CalendarWindowSerializer(serializers.Serializer):
+    max_months = MAX_CALENDAR_MONTHS
+
+    # "from" é palavra reservada, então os campos são declarados aqui
+    def get_fields(self):
+        fields = super().get_fields()
+        fields["from"] = serializers.DateField(validators=[validate_supported_date])
+        fields["to"] = serializers.DateField(validators=[validate_supported_date])
+        return fields
+
+    def validate(self, attrs):
+        if attrs["from"] >= attrs["to"]:
+            raise serializers.ValidationError({"to": "End date must be after start date"})
+        if len(get_months_in_range(attrs["from"], attrs["to"])) > self.max_months:
+            raise serializers.ValidationError(
+                {"to": f"Calendar window cannot span more than {self.max_months} months"}
+            )
+        return attrs
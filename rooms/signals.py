@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from reservations.models import Reservation, ReservationPet
+from .models import Room, RoomType
+from .aux_functions.registry import room_type_registry
+from .aux_functions.cache import invalidate_occupancy, invalidate_room_type
+
+
+def invalidate_after_commit(function, *args):
+    # invalida já e de novo no commit, para não guardar o que outro processo leu antes dele
+    function(*args)
+    transaction.on_commit(lambda: function(*args))
+
+
+def invalidate_stays(reservation_pets):
+    """
+    Does what the ReservationPet post_save receivers below do, for stays written
+    with bulk_create, which does not send post_save.
+    """
+    room_type_ids = sorted(
+        {res_pet.room_type_id for res_pet in reservation_pets if res_pet.checkin}
+    )
+    if room_type_ids:
+        invalidate_after_commit(
+            invalidate_occupancy,
+            room_type_ids,
+            min(res_pet.checkin for res_pet in reservation_pets),
+            max(res_pet.checkout for res_pet in reservation_pets),
+        )
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def invalidate_reservation_occupancy(sender, instance, **kwargs):
+    room_type_ids = list(
+        instance.reservation_pets.values_list("room_type_id", flat=True).distinct()
+    )
+    if room_type_ids:
+        invalidate_after_commit(
+            invalidate_occupancy, room_type_ids, instance.checkin, instance.checkout
+        )
+
+
+@receiver(post_save, sender=ReservationPet)
+@receiver(post_delete, sender=ReservationPet)
+def invalidate_reservation_pet_occupancy(sender, instance, **kwargs):
+    if instance.checkin is None or instance.room_type_id is None:
+        return
+    invalidate_after_commit(
+        invalidate_occupancy, [instance.room_type_id], instance.checkin, instance.checkout
+    )
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def invalidate_room_type_occupancy(sender, instance, **kwargs):
+    invalidate_after_commit(invalidate_room_type, instance.room_type_id)
+
+
+@receiver(post_save, sender=RoomType)
+@receiver(post_delete, sender=RoomType)
+def invalidate_room_type_registry(sender, **kwargs):
+    invalidate_after_commit(room_type_registry.invalidate)
@@ -9,4 +9,10 @@ urlpatterns = [
     path("roomstypes/", views.RoomTypesView.as_view()),
     path("roomstypes/<int:pk>/", views.RoomTypeDetailView.as_view()),
     path("rooms/dates/<int:pk>/", views.RoomDatesView.as_view()),
+    path(
+        "rooms/dates/<int:pk>/<int:year>/<int:month>/",
+        views.RoomMonthDatesView.as_view(),
+    ),
+    path("availability/", views.AvailabilityView.as_view()),
+    path("availability/cache/", views.AvailabilityCacheView.as_view()),
 ]
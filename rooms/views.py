@@ -1,17 +1,26 @@
+from datetime import date
 from django.shortcuts import get_object_or_404
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.views import Response, status
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from .permissions import IsAdminUser, IsAdm
 from .models import Room, RoomType
-from .serializers import Room_TypeSerializer, RoomSerializer
-from .aux_functions.dates import get_min_and_max_dates, get_dates_in_range
+from .serializers import (
+    Room_TypeSerializer,
+    RoomSerializer,
+    AvailabilitySearchSerializer,
+    RoomTypeAvailabilitySerializer,
+    CalendarWindowSerializer,
+)
 from .aux_functions.availability import (
-    get_all_reservations_dates_of_a_given_room_type, 
-    get_all_reservations_of_a_given_room_type, 
-    get_shared_room_population,
-    exists_available_room
+    get_all_reservations_dates_of_a_given_room_type,
+    get_reserved_date_range,
+    get_room_types_availability,
+    get_blocked_dates_by_month,
+    get_calendar_etag,
 )
+from .aux_functions.dates import get_months_in_range, get_next_month
+from .aux_functions.cache import get_occupancy_engine, get_cache_stats
 from rest_framework.generics import (
     ListCreateAPIView,
     ListAPIView,
@@ -85,15 +94,69 @@ class RoomDatesView(APIView):
 
     def get(self, request, pk):
         room_type = get_object_or_404(RoomType, pk=pk)
-        room_type_reservations = get_all_reservations_of_a_given_room_type(pk)
-        min_checkin, max_checkout = get_min_and_max_dates(room_type_reservations)
-        all_dates = get_dates_in_range(min_checkin, max_checkout)
-
-        # para o quarto compartilhado:
-        if room_type.title == 'Quarto Compartilhado':
-            result = [date for date in all_dates if get_shared_room_population(date) >= room_type.capacity]
-        else:
-            result = [date for date in all_dates if not exists_available_room(date, pk)]
+        if "from" in request.query_params or "to" in request.query_params:
+            return self.get_window(request, room_type)
+
+        min_checkin, max_checkout = get_reserved_date_range(pk)
+        if min_checkin is None:
+            return Response([], status=status.HTTP_200_OK)
+
+        engine = get_occupancy_engine(min_checkin, max_checkout, [room_type.id])
+        result = engine.get_blocked_dates(room_type)
+        return Response(result, status=status.HTTP_200_OK)
+
+    def get_window(self, request, room_type):
+        window = CalendarWindowSerializer(data=request.query_params)
+        window.is_valid(raise_exception=True)
+
+        months = get_months_in_range(
+            window.validated_data["from"], window.validated_data["to"]
+        )
+        blocked_dates_by_month = get_blocked_dates_by_month(room_type, months)
+        result = [
+            {
+                "month": month.strftime("%Y-%m"),
+                "blocked_dates": blocked_dates,
+                "etag": get_calendar_etag(room_type, month, blocked_dates),
+            }
+            for month, blocked_dates in blocked_dates_by_month.items()
+        ]
         return Response(result, status=status.HTTP_200_OK)
 
-    
\ No newline at end of file
+
+class RoomMonthDatesView(APIView):
+
+    def get(self, request, pk, year, month):
+        room_type = get_object_or_404(RoomType, pk=pk)
+        try:
+            first_day = date(year, month, 1)
+            get_next_month(first_day)
+        except ValueError:
+            return Response(
+                {"detail": "Invalid month"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        blocked_dates = get_blocked_dates_by_month(room_type, [first_day])[first_day]
+        etag = get_calendar_etag(room_type, first_day, blocked_dates)
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(blocked_dates, status=status.HTTP_200_OK, headers={"ETag": etag})
+
+
+class AvailabilityView(APIView):
+
+    def get(self, request):
+        search = AvailabilitySearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+
+        availability = get_room_types_availability(**search.validated_data)
+        serializer = RoomTypeAvailabilitySerializer(availability, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class AvailabilityCacheView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdm]
+
+    def get(self, request):
+        return Response(get_cache_stats(), status=status.HTTP_200_OK)
@@ -30,6 +30,7 @@ def create_roomTypeCat_with_user(roomType_data: dict = None) -> RoomType:
             "description": "Quarto privativo de alto padrão para o seu felino aproveitar com classe!",
             "capacity": 2,
             "price": 250,
+            "kind": "cats",
         }
 
         roomTypeCat = RoomType.objects.create(**roomType_data)
@@ -46,6 +47,7 @@ def create_roomTypeShared_with_user(roomType_data: dict = None) -> RoomType:
             "description": "Ótimo custo benefício, essa opção é ideal para você que deseja que o seu pet interaja com outros catioros!",
             "capacity": 30,
             "price": 120,
+            "kind": "shared",
         }
 
         roomTypeShared = RoomType.objects.create(**roomType_data)
@@ -98,7 +98,7 @@ class PetViewListTest(APITestCase):
             }
         ]
 
-        resulted_data = response.json()
+        resulted_data = response.json()["results"]
 
         msg = (
             "Verifique a quantidade de dados retornados do GET com token "
@@ -124,7 +124,7 @@ class PetViewListTest(APITestCase):
 
         # RETORNO JSON
 
-        resulted_data = response.json()
+        resulted_data = response.json()["results"]
         results_len = len(resulted_data)
         expected_len = 2
 
@@ -152,7 +152,7 @@ class PetViewListTest(APITestCase):
 
         # RETORNO JSON
 
-        resulted_data = response.json()
+        resulted_data = response.json()["results"]
         results_len = len(resulted_data)
         expected_len = 2
 
@@ -0,0 +1,177 @@
+from datetime import datetime, time, timedelta
+from unittest.mock import patch
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from reports.models import AnalyticsJob
+from reservations.models import Reservation
+from reservations.serializers import ReservationSerializer
+from reservations.aux_functions.analytics import (
+    PENDING_TIMEOUT,
+    run_analytics_job,
+    run_analytics_job_in_background,
+)
+from rooms.models import RoomType
+from rooms.aux_functions.dates import get_next_month
+from rooms.aux_functions.registry import room_type_registry
+from services.models import Service
+from tests.factories import create_user_with_token, create_normal_user_with_token
+from tests.factories.create_pet_factories import create_multiple_pet_with_user
+
+
+class AnalyticsReportView(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user_1_super, token_1 = create_user_with_token()
+        cls.access_token_1 = str(token_1.access_token)
+        _, token_2 = create_normal_user_with_token()
+        cls.access_token_2 = str(token_2.access_token)
+        cls.dogs = create_multiple_pet_with_user(user=cls.user_1_super, pets_count=2, type="dog")
+        cls.room_dog = RoomType.objects.get(title="Quarto Privativo (cães)")
+        cls.room_shared = RoomType.objects.get(title="Quarto Compartilhado")
+        cls.service = Service.objects.order_by("id").first()
+        cls.today = datetime.now().date()
+        cls.BASE_URL = "/api/reports/analytics/"
+
+        cls.first = cls.book(cls.today + timedelta(10), 3, pets=2, services=True)
+        cls.second = cls.book(cls.today + timedelta(15), 1, pets=1)
+        cls.cancelled = cls.book(cls.today + timedelta(20), 2, pets=1, status="cancelled")
+        # todas reservadas hoje: antecedência de 10, 15 e 20 dias
+        Reservation.objects.update(
+            created_at=timezone.make_aware(datetime.combine(cls.today, time(12)))
+        )
+
+    @classmethod
+    def book(cls, checkin, nights, pets, services=False, status=None):
+        room_types = [cls.room_dog, cls.room_shared]
+        data = {
+            "checkin": checkin.strftime("%Y-%m-%d"),
+            "checkout": (checkin + timedelta(nights)).strftime("%Y-%m-%d"),
+            "pet_rooms": [
+                {"pet_id": str(dog.id), "room_type_id": room_type.id}
+                for dog, room_type in zip(cls.dogs[:pets], room_types)
+            ],
+        }
+        if services:
+            data["services"] = [{"service_id": cls.service.id, "amount": 2}]
+        if status:
+            data["status"] = status
+        serializer = ReservationSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save(user=cls.user_1_super)
+
+    def setUp(self):
+        cache.clear()
+        room_type_registry.invalidate()
+
+    def get_report(self, start, end, token=None):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + (token or self.access_token_1))
+        return self.client.get(self.BASE_URL, {"from": str(start), "to": str(end)})
+
+    def test_report_only_for_admin(self):
+        response = self.get_report(self.today, self.today + timedelta(30), self.access_token_2)
+        self.assertEqual(403, response.status_code)
+
+    def test_report_metrics(self):
+        start = self.today.replace(day=1)
+        end = get_next_month(get_next_month(self.today + timedelta(20)))
+        response = self.get_report(start, end)
+        self.assertEqual(200, response.status_code)
+        report = response.json()
+
+        self.assertEqual(3, report["reservations"])
+        self.assertEqual(f"{self.first.total + self.second.total:.2f}", report["revenue"])
+        self.assertEqual(2.0, report["average_length_of_stay"])
+        self.assertEqual(15.0, report["average_lead_time"])
+        self.assertEqual(15.0, report["median_lead_time"])
+        self.assertEqual(0.5, report["service_attach_rate"])
+        self.assertEqual(0.3333, report["cancellation_rate"])
+
+        months = {month["month"]: month for month in report["months"]}
+        self.assertEqual(len(report["months"]), len(months))
+        self.assertEqual(f"{start:%Y-%m}", report["months"][0]["month"])
+        expected = {month: 0 for month in months}
+        for reservation, pet_nights in [(self.first, 6), (self.second, 1)]:
+            expected[f"{reservation.checkin:%Y-%m}"] += pet_nights
+        self.assertDictEqual(
+            expected, {month: row["pet_nights"] for month, row in months.items()}
+        )
+        self.assertEqual(2, sum(month["reservations"] for month in months.values()))
+
+    def test_empty_window(self):
+        start = self.today - timedelta(90)
+        response = self.get_report(start, start + timedelta(30))
+        self.assertEqual(200, response.status_code)
+        report = response.json()
+        self.assertEqual(0, report["reservations"])
+        self.assertEqual("0.00", report["revenue"])
+        self.assertIsNone(report["average_length_of_stay"])
+        self.assertIsNone(report["average_lead_time"])
+
+    def test_invalid_window(self):
+        response = self.get_report(self.today, self.today)
+        self.assertEqual(400, response.status_code)
+
+        response = self.get_report(self.today, self.today + timedelta(366 * 11))
+        self.assertEqual(400, response.status_code)
+
+    def test_multi_year_window_runs_in_background(self):
+        start = self.today.replace(day=1, month=1)
+        end = start.replace(year=start.year + 3)
+        with patch("reservations.aux_functions.analytics.analytics_executor") as executor:
+            response = self.get_report(start, end)
+            self.assertEqual(202, response.status_code)
+            self.assertDictEqual({"status": "pending"}, response.json())
+            job = AnalyticsJob.objects.get(start=start, end=end)
+            executor.submit.assert_called_once_with(run_analytics_job_in_background, job.id)
+
+            # o job já está na fila: uma nova requisição não cria outro
+            response = self.get_report(start, end)
+            self.assertEqual(202, response.status_code)
+            executor.submit.assert_called_once()
+
+            # o worker guarda o relatório no banco, visível sem o cache do processo
+            run_analytics_job(job.id)
+            cache.clear()
+            response = self.get_report(start, end)
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(3, response.json()["reservations"])
+            self.assertEqual(36, len(response.json()["months"]))
+            executor.submit.assert_called_once()
+
+    def test_failed_job_is_logged_and_not_retried_on_poll(self):
+        start = self.today.replace(day=1, month=1)
+        end = start.replace(year=start.year + 3)
+        with patch("reservations.aux_functions.analytics.analytics_executor") as executor:
+            self.get_report(start, end)
+            job = AnalyticsJob.objects.get(start=start, end=end)
+
+            with patch(
+                "reservations.aux_functions.analytics.build_analytics_report",
+                side_effect=MemoryError,
+            ), self.assertLogs("reservations.aux_functions.analytics", "ERROR"):
+                run_analytics_job(job.id)
+            job.refresh_from_db()
+            self.assertEqual("failed", job.status)
+            self.assertEqual("MemoryError()", job.error)
+
+            response = self.get_report(start, end)
+            self.assertEqual(500, response.status_code)
+            self.assertEqual("failed", response.json()["status"])
+            executor.submit.assert_called_once()
+
+    def test_stale_job_is_started_again(self):
+        start = self.today.replace(day=1, month=1)
+        end = start.replace(year=start.year + 3)
+        # job pendente de um processo que morreu
+        job = AnalyticsJob.objects.create(
+            start=start,
+            end=end,
+            updated_at=timezone.now() - timedelta(seconds=PENDING_TIMEOUT + 1),
+        )
+        with patch("reservations.aux_functions.analytics.analytics_executor") as executor:
+            response = self.get_report(start, end)
+            self.assertEqual(202, response.status_code)
+            executor.submit.assert_called_once_with(run_analytics_job_in_background, job.id)
+        job.refresh_from_db()
+        self.assertGreater(job.updated_at, timezone.now() - timedelta(seconds=PENDING_TIMEOUT))
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from reservations.serializers import ReservationSerializer
+from rooms.models import Room, RoomType
+from rooms.aux_functions.cache import CACHE_TIMEOUT
+from rooms.aux_functions.dates import get_next_month
+from rooms.aux_functions.registry import room_type_registry
+from tests.factories import create_user_with_token, create_normal_user_with_token
+from tests.factories.create_pet_factories import create_multiple_pet_with_user
+
+
+class OccupancyReportView(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user_1_super, token_1 = create_user_with_token()
+        cls.access_token_1 = str(token_1.access_token)
+        _, token_2 = create_normal_user_with_token()
+        cls.access_token_2 = str(token_2.access_token)
+        cls.dogs = create_multiple_pet_with_user(user=cls.user_1_super, pets_count=3, type="dog")
+        cls.room_dog = RoomType.objects.get(title="Quarto Privativo (cães)")
+        cls.room_shared = RoomType.objects.get(title="Quarto Compartilhado")
+        cls.checkin = datetime.now().date() + timedelta(10)
+        cls.BASE_URL = "/api/reports/occupancy/"
+
+        serializer = ReservationSerializer(
+            data={
+                "checkin": cls.checkin.strftime("%Y-%m-%d"),
+                "checkout": (cls.checkin + timedelta(2)).strftime("%Y-%m-%d"),
+                "pet_rooms": [
+                    {"pet_id": str(cls.dogs[0].id), "room_type_id": cls.room_dog.id},
+                    {"pet_id": str(cls.dogs[1].id), "room_type_id": cls.room_shared.id},
+                    {"pet_id": str(cls.dogs[2].id), "room_type_id": cls.room_shared.id},
+                ],
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=cls.user_1_super)
+
+    def setUp(self):
+        cache.clear()
+        room_type_registry.invalidate()
+
+    def get_report(self, start, end, token=None):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + (token or self.access_token_1))
+        return self.client.get(self.BASE_URL, {"from": str(start), "to": str(end)})
+
+    def test_report_only_for_admin(self):
+        response = self.get_report(self.checkin, self.checkin + timedelta(1), self.access_token_2)
+        self.assertEqual(403, response.status_code)
+
+    def test_report_counts(self):
+        response = self.get_report(self.checkin - timedelta(1), self.checkin + timedelta(3))
+        self.assertEqual(200, response.status_code)
+        report = {row["room_type_id"]: row for row in response.json()}
+        self.assertSetEqual(set(RoomType.objects.values_list("id", flat=True)), set(report))
+
+        private = report[self.room_dog.id]
+        self.assertEqual("rooms", private["unit"])
+        self.assertListEqual([0, 1, 1, 0], [night["occupied"] for night in private["nights"]])
+        self.assertEqual(Room.objects.filter(room_type=self.room_dog).count(), private["nights"][0]["total"])
+        self.assertEqual(str(self.checkin), private["nights"][1]["date"])
+
+        shared = report[self.room_shared.id]
+        self.assertEqual("pets", shared["unit"])
+        self.assertListEqual([0, 2, 2, 0], [night["occupied"] for night in shared["nights"]])
+        self.assertEqual(self.room_shared.capacity, shared["nights"][0]["total"])
+
+    def test_invalid_window(self):
+        response = self.get_report(self.checkin, self.checkin)
+        self.assertEqual(400, response.status_code)
+
+    def test_past_months_are_cached_with_expiry(self):
+        this_month = datetime.now().date().replace(day=1)
+        last_month = (this_month - timedelta(1)).replace(day=1)
+        with patch("rooms.aux_functions.cache.cache.set_many", wraps=cache.set_many) as set_many:
+            self.get_report(last_month, get_next_month(this_month))
+
+        timeouts = {
+            key.rsplit(":", 1)[1]: timeout
+            for (keys, timeout), _ in set_many.call_args_list
+            for key in keys
+        }
+        # as invalidações de outros processos não chegam a um cache local
+        self.assertEqual(CACHE_TIMEOUT, timeouts[f"{last_month:%Y-%m}"])
+        self.assertEqual(CACHE_TIMEOUT, timeouts[f"{this_month:%Y-%m}"])
+
+        # segunda chamada só lê o cache
+        with self.assertNumQueries(1):
+            self.get_report(last_month, get_next_month(this_month))
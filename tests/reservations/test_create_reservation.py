@@ -211,6 +211,23 @@ class ReservationCreateView(APITestCase):
             )
             self.assertEqual(expected_status_code, result_status_code, msg)
 
+    def test_reservation_creation_pet_after_cancelled_reservation(self):
+        reservation = create_dog_reservation(user=self.user_1_super)
+        pet_id = reservation.reservation_pets.last().pet_id
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_1)
+        self.client.delete(f"{self.BASE_URL}{reservation.id}/")
+
+        reservation_data = {
+            "checkin": "2023-02-23",
+            "checkout": "2023-02-25",
+            "pet_rooms": [
+                {"pet_id": str(pet_id), "room_type_id": self.room_types.get(title="Quarto Privativo (cães)").id}
+            ],
+        }
+        response = self.client.post(self.BASE_URL, data=reservation_data, format="json")
+        msg = "Verifique se um pet de uma reserva cancelada pode ser reservado nas mesmas datas"
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code, msg)
+
     def test_reservation_creation_current_date(self):
         cat_room = self.room_types.get(title="Quarto Privativo (gatos)")
         today = datetime.now().date()
@@ -293,6 +310,38 @@ class ReservationCreateView(APITestCase):
             response_data["checkin"][0], "Checkout date must be after checkin"
         )
 
+    def test_reservation_creation_longer_than_max_stay(self):
+        cat_room = self.room_types.get(title="Quarto Privativo (gatos)")
+        reservation_data = {
+            "checkin": "2023-07-12",
+            "checkout": "2123-07-12",
+            "pet_rooms": [
+                {"pet_id": self.user_1_cat.id, "room_type_id": str(cat_room.id)}
+            ],
+        }
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_1)
+        response = self.client.post(self.BASE_URL, data=reservation_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()["checkin"][0], "Stay cannot be longer than 365 nights"
+        )
+
+    def test_reservation_creation_in_last_supported_month(self):
+        cat_room = self.room_types.get(title="Quarto Privativo (gatos)")
+        reservation_data = {
+            "checkin": "9999-12-01",
+            "checkout": "9999-12-02",
+            "pet_rooms": [
+                {"pet_id": self.user_1_cat.id, "room_type_id": str(cat_room.id)}
+            ],
+        }
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_1)
+        response = self.client.post(self.BASE_URL, data=reservation_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()["checkin"][0], "Date is out of the supported range"
+        )
+
     def test_reservation_creation_with_invalid_service_id(self):
         cat_room = self.room_types.get(title="Quarto Privativo (gatos)")
         reservation_data = {
@@ -372,3 +421,62 @@ class ReservationCreateView(APITestCase):
         self.assertEqual(
             response_data["pet_rooms"][0], "Trying to book the same pet twice"
         )
+
+    def test_reservation_creation_returns_all_errors(self):
+        cat_room = self.room_types.get(title="Quarto Privativo (gatos)")
+        reservation_data = {
+            "checkin": "2023-07-12",
+            "checkout": "2023-07-15",
+            "pet_rooms": [
+                {"pet_id": str(self.user_1_dog.id), "room_type_id": cat_room.id},
+                {"pet_id": "id inválida", "room_type_id": cat_room.id},
+                {"pet_id": str(self.user_1_cat.id), "room_type_id": 999999},
+            ],
+            "services": [{"service_id": 999999, "amount": 1}],
+        }
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_1)
+        response = self.client.post(self.BASE_URL, data=reservation_data, format="json")
+        response_data = response.json()
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertListEqual(
+            [
+                "Invalid pet id",
+                "Pet not compatible with the room",
+                "Room type 999999 not found",
+            ],
+            response_data["pet_rooms"],
+        )
+        self.assertListEqual(["Service 999999 not found"], response_data["services"])
+
+    def test_reservation_creation_with_missing_pet(self):
+        cat_room = self.room_types.get(title="Quarto Privativo (gatos)")
+        reservation_data = {
+            "checkin": "2023-07-12",
+            "checkout": "2023-07-15",
+            "pet_rooms": [
+                {
+                    "pet_id": "00000000-0000-0000-0000-000000000000",
+                    "room_type_id": cat_room.id,
+                }
+            ],
+        }
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_1)
+        response = self.client.post(self.BASE_URL, data=reservation_data, format="json")
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_reservation_creation_with_pet_of_another_user(self):
+        dog_room = self.room_types.get(title="Quarto Privativo (cães)")
+        reservation_data = {
+            "checkin": "2023-07-12",
+            "checkout": "2023-07-15",
+            "pet_rooms": [
+                {"pet_id": str(self.user_1_dog.id), "room_type_id": dog_room.id}
+            ],
+        }
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_2)
+        response = self.client.post(self.BASE_URL, data=reservation_data, format="json")
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(
+            [f"Pet {self.user_1_dog.id} does not belong to the user"],
+            response.json()["pet_rooms"],
+        )
@@ -1,3 +1,4 @@
+from unittest.mock import patch
 from rest_framework.test import APITestCase
 from rest_framework.views import status
 from tests.factories import create_user_with_token, create_normal_user_with_token
@@ -100,12 +101,18 @@ class ReservationDeleteView(APITestCase):
         )
         self.assertDictEqual(expected_data, resulted_data, msg)
 
+        # a permissão é checada antes de cancelar
+        self.user_1_reservation.refresh_from_db()
+        self.assertNotEqual("cancelled", self.user_1_reservation.status)
+
     def test_delete_cancelled_reservation(self):
         self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_2)
         self.client.delete(self.reservation_cancelled_URL, format="json")
 
         self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_2)
-        response = self.client.delete(self.reservation_cancelled_URL, format="json")
+        with patch("reservations.views.release_rooms") as release_rooms:
+            response = self.client.delete(self.reservation_cancelled_URL, format="json")
+        release_rooms.assert_not_called()
 
         # STATUS CODE
         expected_status_code = status.HTTP_400_BAD_REQUEST
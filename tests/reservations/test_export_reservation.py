@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+from rest_framework.test import APITestCase
+from tests.factories import create_user_with_token, create_normal_user_with_token
+from tests.factories.reservation_factories import create_dog_reservation
+
+
+class ReservationExportView(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user_1_super, token_1 = create_user_with_token()
+        cls.access_token_1 = str(token_1.access_token)
+        cls.user_2_normal, token_2 = create_normal_user_with_token()
+        cls.access_token_2 = str(token_2.access_token)
+        cls.reservation_1 = create_dog_reservation(user=cls.user_1_super)
+        cls.reservation_2 = create_dog_reservation(user=cls.user_2_normal)
+        cls.BASE_URL = "/api/reservations/export/"
+
+    def get_content(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_only_for_admin(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_2)
+        response = self.client.get(self.BASE_URL)
+        self.assertEqual(403, response.status_code)
+
+    def test_export_csv(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_1)
+        # reservas + usuário, as linhas saem de um iterator
+        with self.assertNumQueries(2):
+            response = self.client.get(self.BASE_URL)
+            rows = list(csv.DictReader(io.StringIO(self.get_content(response))))
+
+        self.assertEqual(200, response.status_code)
+        self.assertIn("reservations.csv", response["Content-Disposition"])
+        self.assertListEqual(
+            [str(self.reservation_1.id), str(self.reservation_2.id)],
+            [row["id"] for row in rows],
+        )
+        self.assertEqual(self.reservation_1.get_effective_status(), rows[0]["status"])
+        self.assertEqual(str(self.reservation_1.total), rows[0]["total"])
+
+    def test_export_ndjson(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_1)
+        response = self.client.get(self.BASE_URL, {"output": "ndjson"})
+        rows = [json.loads(line) for line in self.get_content(response).splitlines()]
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, len(rows))
+        self.assertEqual(str(self.user_2_normal.id), rows[1]["user_id"])
+
+    def test_export_unknown_format(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_1)
+        response = self.client.get(self.BASE_URL, {"output": "xml"})
+        self.assertEqual(400, response.status_code)
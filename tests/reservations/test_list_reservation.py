@@ -1,5 +1,9 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework.views import status
+from reservations.models import Reservation
 from tests.factories import create_user_with_token, create_normal_user_with_token
 from tests.factories.reservation_factories import create_dog_reservation
 
@@ -67,11 +71,18 @@ class ReservationListView(APITestCase):
                 "updated_at": self.reservation_dog.updated_at.strftime(
                     "%Y-%m-%dT%H:%M:%S.%fZ"
                 ),
-                "pets_rooms": [{"pet": "dog", "rooms_type_id": 2}],
+                "total": str(self.reservation_dog.total),
+                "pets_rooms": [
+                    {
+                        "pet": "dog",
+                        "rooms_type_id": 2,
+                        "price": str(self.reservation_dog.reservation_pets.get().price),
+                    }
+                ],
                 "services": [],
             }
         ]
-        resulted_data = response.json()
+        resulted_data = response.json()["results"]
 
         msg = (
             "Verifique se os dados retornados do GET com token "
@@ -94,7 +105,7 @@ class ReservationListView(APITestCase):
 
         # RETORNO JSON
 
-        resulted_data = response.json()
+        resulted_data = response.json()["results"]
         results_len = len(resulted_data)
         expected_len = 2
 
@@ -103,3 +114,58 @@ class ReservationListView(APITestCase):
             + f"em `{self.BASE_URL}` é {results_len}"
         )
         self.assertEqual(expected_len, results_len, msg)
+
+    def test_list_reservations_with_constant_queries(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_1)
+        # usuário + reservas + pets + serviços
+        with self.assertNumQueries(4):
+            self.client.get(self.BASE_URL, format="json")
+
+        for _ in range(5):
+            create_dog_reservation(user=self.user_1_super)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.BASE_URL, format="json")
+        self.assertEqual(7, len(response.json()["results"]))
+
+    def test_list_reservations_by_cursor(self):
+        for _ in range(3):
+            create_dog_reservation(user=self.user_1_super)
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_1)
+
+        ids = []
+        url = f"{self.BASE_URL}?page_size=2"
+        while url:
+            response = self.client.get(url, format="json").json()
+            self.assertLessEqual(len(response["results"]), 2)
+            ids += [reservation["id"] for reservation in response["results"]]
+            url = response["next"]
+
+        expected_ids = Reservation.objects.order_by("created_at", "id").values_list("id", flat=True)
+        self.assertListEqual([str(id) for id in expected_ids], ids)
+
+    def test_list_reservations_by_cursor_with_same_created_at(self):
+        for _ in range(5):
+            create_dog_reservation(user=self.user_1_super)
+        # como as linhas antigas preenchidas pela migração com o mesmo horário
+        Reservation.objects.update(created_at=timezone.now())
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_1)
+
+        ids = []
+        url = f"{self.BASE_URL}?page_size=2"
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, format="json").json()
+            self.assertFalse(any("OFFSET" in query["sql"] for query in queries))
+            ids += [reservation["id"] for reservation in response["results"]]
+            last_page, url = response, response["next"]
+
+        expected_ids = [str(id) for id in Reservation.objects.order_by("id").values_list("id", flat=True)]
+        self.assertListEqual(expected_ids, ids)
+
+        previous_ids = []
+        url = last_page["previous"]
+        while url:
+            response = self.client.get(url, format="json").json()
+            previous_ids = [reservation["id"] for reservation in response["results"]] + previous_ids
+            url = response["previous"]
+        self.assertListEqual(expected_ids[: -len(last_page["results"])], previous_ids)
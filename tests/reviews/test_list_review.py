@@ -38,7 +38,7 @@ class ReviewListView(APITestCase):
         )
         self.assertEqual(expected_status_code, resulted_status_code, msg)
 
-        resulted_data = response.json()
+        resulted_data = response.json()["results"]
 
         results_len = len(resulted_data)
         expected_len = 1
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from rest_framework.views import status
+from rooms.models import RoomType
+from rooms.aux_functions.cache import invalidate_room_type
+from rooms.aux_functions.registry import room_type_registry
+from reservations.serializers import ReservationSerializer
+from tests.factories import create_normal_user_with_token
+from tests.factories.create_pet_factories import create_multiple_pet_with_user
+
+
+class AvailabilityView(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user, _ = create_normal_user_with_token()
+        cls.dogs = create_multiple_pet_with_user(user=cls.user, pets_count=4, type="dog")
+
+        cls.roomCat = RoomType.objects.get(title="Quarto Privativo (gatos)")
+        cls.roomDog = RoomType.objects.get(title="Quarto Privativo (cães)")
+        cls.roomShared = RoomType.objects.get(title="Quarto Compartilhado")
+
+        cls.checkin = datetime.now().date() + timedelta(10)
+        cls.checkout = cls.checkin + timedelta(3)
+        pet_rooms = [
+            (cls.dogs[0], cls.roomDog),
+            (cls.dogs[1], cls.roomShared),
+            (cls.dogs[2], cls.roomShared),
+            (cls.dogs[3], cls.roomShared),
+        ]
+        for dog, room_type in pet_rooms:
+            serializer = ReservationSerializer(
+                data={
+                    "checkin": cls.checkin.strftime("%Y-%m-%d"),
+                    "checkout": cls.checkout.strftime("%Y-%m-%d"),
+                    "pet_rooms": [{"pet_id": str(dog.id), "room_type_id": room_type.id}],
+                }
+            )
+            serializer.is_valid(raise_exception=True)
+            serializer.save(user=cls.user)
+
+        cls.BASE_URL = (
+            f"/api/availability/?checkin={cls.checkin.strftime('%Y-%m-%d')}"
+            + f"&checkout={cls.checkout.strftime('%Y-%m-%d')}"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_availability_of_all_room_types(self):
+        response = self.client.get(f"{self.BASE_URL}&dogs=2", format="json")
+
+        expected_status_code = status.HTTP_200_OK
+        msg = (
+            "Verifique se o status code retornado do GET "
+            + f"em `{self.BASE_URL}` é {expected_status_code}"
+        )
+        self.assertEqual(expected_status_code, response.status_code, msg)
+
+        resulted_data = {room_type["id"]: room_type for room_type in response.json()}
+        self.assertEqual(9, resulted_data[self.roomDog.id]["free_rooms"])
+        self.assertTrue(resulted_data[self.roomDog.id]["available"])
+        self.assertEqual(10, resulted_data[self.roomCat.id]["free_rooms"])
+        self.assertFalse(resulted_data[self.roomCat.id]["available"])
+        self.assertIsNone(resulted_data[self.roomShared.id]["free_rooms"])
+        self.assertEqual(17, resulted_data[self.roomShared.id]["remaining_capacity"])
+        self.assertEqual("120.00", resulted_data[self.roomShared.id]["price"])
+
+    def test_availability_outside_booked_window(self):
+        checkin = self.checkout.strftime("%Y-%m-%d")
+        checkout = (self.checkout + timedelta(1)).strftime("%Y-%m-%d")
+        url = f"/api/availability/?checkin={checkin}&checkout={checkout}"
+        response = self.client.get(url, format="json")
+
+        resulted_data = {room_type["id"]: room_type for room_type in response.json()}
+        self.assertEqual(10, resulted_data[self.roomDog.id]["free_rooms"])
+        self.assertEqual(20, resulted_data[self.roomShared.id]["remaining_capacity"])
+
+    def test_availability_with_constant_queries(self):
+        # room types + quartos + ocupação
+        room_type_registry.invalidate()
+        with self.assertNumQueries(3):
+            response = self.client.get(self.BASE_URL, format="json")
+        resulted_ids = [room_type["id"] for room_type in response.json()]
+
+        # os room types ficam no registro do processo, só a ocupação é lida de novo
+        for room_type_id in resulted_ids:
+            invalidate_room_type(room_type_id)
+        with self.assertNumQueries(2):
+            self.client.get(self.BASE_URL, format="json")
+
+    def test_availability_with_invalid_dates(self):
+        url = (
+            f"/api/availability/?checkin={self.checkout.strftime('%Y-%m-%d')}"
+            + f"&checkout={self.checkin.strftime('%Y-%m-%d')}"
+        )
+        response = self.client.get(url, format="json")
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn("checkin", response.json())
+
+        response = self.client.get("/api/availability/", format="json")
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_availability_with_too_long_stay(self):
+        checkin = self.checkin.strftime("%Y-%m-%d")
+        checkout = (self.checkin + timedelta(366)).strftime("%Y-%m-%d")
+        url = f"/api/availability/?checkin={checkin}&checkout={checkout}"
+        response = self.client.get(url, format="json")
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn("checkout", response.json())
+
+        response = self.client.get("/api/availability/?checkin=2023-01-01&checkout=9000-01-01", format="json")
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_availability_with_out_of_range_dates(self):
+        url = "/api/availability/?checkin=9999-12-20&checkout=9999-12-31"
+        response = self.client.get(url, format="json")
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn("checkin", response.json())
+
+        # o último mês aceito ainda é consultado
+        url = "/api/availability/?checkin=9999-11-20&checkout=9999-11-30"
+        response = self.client.get(url, format="json")
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+    def test_availability_without_room_types(self):
+        RoomType.objects.all().delete()
+        room_type_registry.invalidate()
+        # o rollback do teste devolve os tipos, o registro do processo não
+        self.addCleanup(room_type_registry.invalidate)
+        response = self.client.get(self.BASE_URL, format="json")
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertListEqual([], response.json())
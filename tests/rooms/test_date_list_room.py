@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from rest_framework.test import APITestCase
 from rest_framework.views import status
 from rooms.models import RoomType
@@ -49,6 +50,9 @@ class DateRoomListView(APITestCase):
         cls.BASE_URL_shared = f"/api/rooms/dates/{cls.roomShared.id}/"
 
 
+    def setUp(self):
+        cache.clear()
+
     def test_list_reservations_private_room(self):
         response = self.client.get(self.BASE_URL_cat, format="json")
 
@@ -118,3 +122,70 @@ class DateRoomListView(APITestCase):
         )
         self.assertEqual(expected_len, results_len, msg)
 
+    def test_list_reservations_with_constant_queries(self):
+        # room type + intervalo de datas + quartos + ocupação
+        with self.assertNumQueries(4):
+            response = self.client.get(self.BASE_URL_shared, format="json")
+
+        expected_data = ['2023-02-22', '2023-02-23']
+        self.assertListEqual(expected_data, response.json())
+
+        # ocupação do mês já em cache
+        with self.assertNumQueries(2):
+            response = self.client.get(self.BASE_URL_shared, format="json")
+        self.assertListEqual(expected_data, response.json())
+
+    def test_list_reservations_by_month_window(self):
+        url = f"{self.BASE_URL_cat}?from=2023-02-10&to=2023-03-10"
+        response = self.client.get(url, format="json")
+
+        expected_status_code = status.HTTP_200_OK
+        msg = (
+            "Verifique se o status code retornado do GET "
+            + f"em `{url}` é {expected_status_code}"
+        )
+        self.assertEqual(expected_status_code, response.status_code, msg)
+
+        resulted_data = response.json()
+        self.assertListEqual(["2023-02", "2023-03"], [month["month"] for month in resulted_data])
+        self.assertListEqual(['2023-02-22', '2023-02-23'], resulted_data[0]["blocked_dates"])
+        self.assertListEqual([], resulted_data[1]["blocked_dates"])
+
+    def test_list_reservations_with_too_large_window(self):
+        url = f"{self.BASE_URL_cat}?from=2023-01-01&to=2024-06-01"
+        response = self.client.get(url, format="json")
+
+        expected_status_code = status.HTTP_400_BAD_REQUEST
+        msg = (
+            "Verifique se o status code retornado do GET com janela maior que o permitido "
+            + f"em `{url}` é {expected_status_code}"
+        )
+        self.assertEqual(expected_status_code, response.status_code, msg)
+        self.assertIn("to", response.json())
+
+    def test_list_reservations_with_out_of_range_window(self):
+        url = f"{self.BASE_URL_cat}?from=9999-11-01&to=9999-12-31"
+        response = self.client.get(url, format="json")
+
+        expected_status_code = status.HTTP_400_BAD_REQUEST
+        msg = (
+            "Verifique se o status code retornado do GET com data fora do suportado "
+            + f"em `{url}` é {expected_status_code}"
+        )
+        self.assertEqual(expected_status_code, response.status_code, msg)
+        self.assertIn("to", response.json())
+
+    def test_list_reservations_of_a_month_with_etag(self):
+        url = f"{self.BASE_URL_cat}2023/2/"
+        response = self.client.get(url, format="json")
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertListEqual(['2023-02-22', '2023-02-23'], response.json())
+
+        window = self.client.get(f"{self.BASE_URL_cat}?from=2023-02-01&to=2023-03-01").json()
+        self.assertEqual(window[0]["etag"], response["ETag"])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        msg = "Verifique se o GET com o ETag do mês retorna 304"
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code, msg)
+
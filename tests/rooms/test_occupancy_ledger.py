@@ -0,0 +1,68 @@
+from io import StringIO
+from datetime import datetime, timedelta
+from django.core.management import call_command, CommandError
+from rest_framework.test import APITestCase
+from rest_framework.views import status
+from rooms.models import RoomType, RoomOccupancy
+from tests.factories import create_user_with_token
+from tests.factories.reservation_factories import create_dog
+
+
+class OccupancyLedgerTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user, token = create_user_with_token()
+        cls.access_token = str(token.access_token)
+
+        cls.dog_1 = create_dog(cls.user)
+        cls.dog_2 = create_dog(cls.user)
+        cls.room_dog = RoomType.objects.get(title="Quarto Privativo (cães)")
+
+        cls.checkin = datetime.now().date() + timedelta(10)
+        cls.checkout = cls.checkin + timedelta(3)
+        cls.BASE_URL = "/api/reservations/"
+
+    def book_dogs(self):
+        reservation_data = {
+            "checkin": self.checkin.strftime("%Y-%m-%d"),
+            "checkout": self.checkout.strftime("%Y-%m-%d"),
+            "pet_rooms": [
+                {"pet_id": str(self.dog_1.id), "room_type_id": self.room_dog.id},
+                {"pet_id": str(self.dog_2.id), "room_type_id": self.room_dog.id},
+            ],
+        }
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token)
+        return self.client.post(self.BASE_URL, data=reservation_data, format="json")
+
+    def test_booking_fills_ledger(self):
+        response = self.book_dogs()
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+
+        nights = RoomOccupancy.objects.filter(room_type=self.room_dog).order_by("date")
+        msg = "Verifique se a reserva registra uma linha por noite no quarto ocupado"
+        self.assertEqual(3, nights.count(), msg)
+        self.assertEqual(self.checkin, nights.first().date, msg)
+        self.assertListEqual([2, 2, 2], [night.occupied for night in nights], msg)
+
+    def test_cancelling_releases_ledger(self):
+        response = self.book_dogs()
+        reservation_url = f"{self.BASE_URL}{response.json()['id']}/"
+
+        response = self.client.delete(reservation_url, format="json")
+        self.assertEqual(status.HTTP_204_NO_CONTENT, response.status_code)
+
+        msg = "Verifique se o cancelamento libera as noites do quarto"
+        self.assertFalse(RoomOccupancy.objects.exists(), msg)
+
+    def test_rebuild_command_fixes_drift(self):
+        self.book_dogs()
+        RoomOccupancy.objects.all().delete()
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_occupancy", "--check", stdout=StringIO())
+
+        call_command("rebuild_occupancy", stdout=StringIO())
+        output = StringIO()
+        call_command("rebuild_occupancy", "--check", stdout=output)
+        self.assertIn("consistent", output.getvalue())
+        self.assertEqual(3, RoomOccupancy.objects.count())
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+from django.core.cache import cache
+from django.test import TestCase
+from rooms.models import Room, RoomType
+from rooms.aux_functions.cache import get_cache_stats, get_occupancy_engine
+from rooms.aux_functions.occupancy import release_rooms
+from reservations.serializers import ReservationSerializer
+from tests.factories import create_user_with_token, create_normal_user_with_token
+from tests.factories.create_pet_factories import create_multiple_pet_with_user
+
+
+class AvailabilityCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user, _ = create_normal_user_with_token()
+        cls.dogs = create_multiple_pet_with_user(user=cls.user, pets_count=2, type="dog")
+        cls.room_shared = RoomType.objects.get(title="Quarto Compartilhado")
+        cls.checkin = datetime.now().date() + timedelta(10)
+        cls.checkout = cls.checkin + timedelta(2)
+
+    def setUp(self):
+        cache.clear()
+
+    def book(self, dog):
+        serializer = ReservationSerializer(
+            data={
+                "checkin": self.checkin.strftime("%Y-%m-%d"),
+                "checkout": self.checkout.strftime("%Y-%m-%d"),
+                "pet_rooms": [{"pet_id": str(dog.id), "room_type_id": self.room_shared.id}],
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer.save(user=self.user)
+
+    def get_population(self):
+        engine = get_occupancy_engine(self.checkin, self.checkout, [self.room_shared.id])
+        return engine.get_population(self.room_shared.id).tolist()
+
+    def test_cached_months_are_counted(self):
+        self.get_population()
+        with self.assertNumQueries(0):
+            self.get_population()
+
+        stats = get_cache_stats()
+        months = 2 if self.checkin.month != (self.checkout - timedelta(1)).month else 1
+        self.assertEqual(months, stats["hits"])
+        self.assertEqual(months, stats["misses"])
+
+    def test_engine_without_room_types(self):
+        with self.assertNumQueries(0):
+            engine = get_occupancy_engine(self.checkin, self.checkout, [])
+        self.assertEqual((0, 2), engine.pets.shape)
+        self.assertEqual(0, len(engine.room_ids))
+
+    def test_booking_and_cancelling_invalidate_cache(self):
+        self.assertListEqual([0, 0], self.get_population())
+
+        reservation = self.book(self.dogs[0])
+        self.assertListEqual([1, 1], self.get_population())
+
+        reservation.status = "cancelled"
+        reservation.save()
+        release_rooms(reservation)
+        self.assertListEqual([0, 0], self.get_population())
+
+    def test_new_room_invalidates_room_type(self):
+        engine = get_occupancy_engine(self.checkin, self.checkout, [self.room_shared.id])
+        self.assertEqual(1, len(engine.room_ids))
+
+        Room.objects.create(room_type=self.room_shared)
+        engine = get_occupancy_engine(self.checkin, self.checkout, [self.room_shared.id])
+        self.assertEqual(2, len(engine.room_ids))
+
+
+class AvailabilityCacheViewTest(TestCase):
+    def test_cache_stats_only_for_admin(self):
+        _, admin_token = create_user_with_token()
+        _, user_token = create_normal_user_with_token()
+
+        response = self.client.get(
+            "/api/availability/cache/",
+            HTTP_AUTHORIZATION="Bearer " + str(user_token.access_token),
+        )
+        self.assertEqual(403, response.status_code)
+
+        response = self.client.get(
+            "/api/availability/cache/",
+            HTTP_AUTHORIZATION="Bearer " + str(admin_token.access_token),
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertSetEqual({"hits", "misses", "hit_ratio"}, set(response.json().keys()))
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from reservations.models import Reservation, ReservationPet, ReservationService
+from reservations.serializers import ReservationSerializer
+from rooms.models import Room, RoomType
+from rooms.aux_functions.availability import RoomUnavailable
+from rooms.aux_functions.registry import room_type_registry
+from services.models import Service
+from tests.factories import create_user_with_token
+from tests.factories.create_pet_factories import create_multiple_pet_with_user
+
+
+class BookingInsertsTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user, _ = create_user_with_token()
+        cls.dogs = create_multiple_pet_with_user(user=cls.user, pets_count=4, type="dog")
+        cls.room_dog = RoomType.objects.get(title="Quarto Privativo (cães)")
+        cls.services = list(Service.objects.order_by("id"))
+        cls.checkin = datetime.now().date() + timedelta(10)
+
+    def setUp(self):
+        cache.clear()
+        room_type_registry.invalidate()
+
+    def book(self, pets, services, checkin=None):
+        checkin = checkin or self.checkin
+        serializer = ReservationSerializer(
+            data={
+                "checkin": checkin.strftime("%Y-%m-%d"),
+                "checkout": (checkin + timedelta(2)).strftime("%Y-%m-%d"),
+                "pet_rooms": [
+                    {"pet_id": str(pet.id), "room_type_id": self.room_dog.id}
+                    for pet in pets
+                ],
+                "services": [
+                    {"service_id": service.id, "amount": 1} for service in services
+                ],
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer.save(user=self.user)
+
+    def count_inserts(self, pets, services, checkin):
+        with CaptureQueriesContext(connection) as context:
+            self.book(pets, services, checkin)
+        return len([q for q in context.captured_queries if q["sql"].startswith("INSERT")])
+
+    def test_insert_count_does_not_grow_with_the_booking(self):
+        small = self.count_inserts(self.dogs[:1], self.services[:1], self.checkin)
+        large = self.count_inserts(
+            self.dogs[1:], self.services[:3], self.checkin + timedelta(5)
+        )
+        self.assertEqual(small, large)
+        reservation = Reservation.objects.get(checkin=self.checkin + timedelta(5))
+        self.assertEqual(3, reservation.reservation_pets.count())
+        self.assertEqual(3, reservation.reservation_services.count())
+
+    def test_failed_allocation_writes_nothing(self):
+        # um pet a mais do que cabe em todos os quartos do tipo
+        rooms_count = Room.objects.filter(room_type=self.room_dog).count()
+        pets = create_multiple_pet_with_user(
+            user=self.user,
+            pets_count=rooms_count * max(self.room_dog.capacity, 1) + 1,
+            type="dog",
+        )
+        with self.assertRaises(RoomUnavailable):
+            self.book(pets, self.services[:2])
+        self.assertEqual(0, Reservation.objects.count())
+        self.assertEqual(0, ReservationPet.objects.count())
+        self.assertEqual(0, ReservationService.objects.count())
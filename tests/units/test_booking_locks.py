@@ -0,0 +1,68 @@
+import threading
+from django.core.cache import cache
+from django.db import connection
+from rest_framework.test import APITestCase
+from rooms.aux_functions.locks import get_lock_stats, get_process_lock, lock_room_types
+from tests.factories import create_user_with_token, create_normal_user_with_token
+
+
+class BookingLocksTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        _, token_adm = create_user_with_token()
+        cls.access_token_adm = str(token_adm.access_token)
+        _, token_normal = create_normal_user_with_token()
+        cls.access_token_normal = str(token_normal.access_token)
+
+    def setUp(self):
+        cache.clear()
+
+    def book_in_thread(self, room_type_id):
+        def book():
+            with lock_room_types([room_type_id]):
+                pass
+            connection.close()
+
+        thread = threading.Thread(target=book)
+        thread.start()
+        return thread
+
+    def test_same_room_type_waits(self):
+        with get_process_lock(1):
+            thread = self.book_in_thread(1)
+            thread.join(0.2)
+            self.assertTrue(thread.is_alive())
+        thread.join()
+
+        stats = get_lock_stats()
+        self.assertEqual(1, stats["acquisitions"])
+        self.assertEqual(1, stats["waits"])
+        self.assertGreaterEqual(stats["max_wait_ms"], 200)
+
+    def test_free_lock_is_not_a_wait(self):
+        with lock_room_types([1, 2]):
+            pass
+
+        stats = get_lock_stats()
+        self.assertEqual(1, stats["acquisitions"])
+        self.assertEqual(0, stats["waits"])
+        self.assertIsNone(stats["average_wait_ms"])
+
+    def test_other_room_types_do_not_wait(self):
+        with get_process_lock(1):
+            thread = self.book_in_thread(2)
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+
+    def test_lock_stats_only_for_admins(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_normal)
+        response = self.client.get("/api/reservations/locks/")
+        self.assertEqual(403, response.status_code)
+
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_adm)
+        response = self.client.get("/api/reservations/locks/")
+        self.assertEqual(200, response.status_code)
+        self.assertSetEqual(
+            {"acquisitions", "waits", "total_wait_ms", "average_wait_ms", "max_wait_ms"},
+            set(response.json().keys()),
+        )
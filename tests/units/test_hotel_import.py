@@ -0,0 +1,296 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DataError
+from django.test import TestCase
+from pets.models import Pet
+from reservations.models import Reservation, ReservationPet
+from rooms.models import Room, RoomOccupancy, RoomType
+from rooms.aux_functions.occupancy import get_occupancy_drift
+from rooms.aux_functions.registry import room_type_registry
+from users.models import User
+
+DOG_ID = "6d3b3c9e-4b0e-4c3a-9a57-0b6f8f1d2a01"
+CAT_ID = "6d3b3c9e-4b0e-4c3a-9a57-0b6f8f1d2a02"
+
+
+class HotelImportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.room_dog = RoomType.objects.get(title="Quarto Privativo (cães)")
+        cls.room_cat = RoomType.objects.get(title="Quarto Privativo (gatos)")
+        cls.today = datetime.now().date()
+
+    def setUp(self):
+        cache.clear()
+        room_type_registry.invalidate()
+        self.directory = tempfile.TemporaryDirectory()
+        self.rejects = os.path.join(self.directory.name, "rejects.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def run_import(self, **files):
+        output = StringIO()
+        args = []
+        for name, path in files.items():
+            args += [f"--{name}", path]
+        call_command(
+            "import_hotel_data", *args, "--batch-size", "2", "--rejects", self.rejects,
+            stdout=output,
+        )
+        return output.getvalue()
+
+    def read_rejects(self):
+        with open(self.rejects, encoding="utf-8") as file:
+            return [json.loads(line) for line in file]
+
+    def test_import_users_pets_and_reservations(self):
+        users = self.write(
+            "users.csv",
+            "name,email,password,is_adm\n"
+            "Ana,ana@mail.com,1234,false\n"
+            "Bia,bia@mail.com,,false\n"
+            "Bia de novo,bia@mail.com,,false\n"
+            ",sem-nome@mail.com,,false\n",
+        )
+        pets = self.write(
+            "pets.jsonl",
+            "\n".join(
+                json.dumps(row)
+                for row in [
+                    {"id": DOG_ID, "user_email": "ana@mail.com", "name": "Rex", "type": "dog",
+                     "age": "2", "neutered": True, "vaccinated": True, "docile": True},
+                    {"id": CAT_ID, "user_email": "ana@mail.com", "name": "Mia", "type": "cat",
+                     "age": "3", "neutered": "sim", "vaccinated": "sim", "docile": "não"},
+                    {"user_email": "ninguem@mail.com", "name": "Bob", "type": "dog",
+                     "age": "1", "neutered": True, "vaccinated": True, "docile": True},
+                ]
+            )
+            + "\nnot json\n",
+        )
+        past = self.today - timedelta(30)
+        future = self.today + timedelta(30)
+        reservations = self.write(
+            "reservations.csv",
+            "reservation,user_email,checkin,checkout,status,pet_id,room_type_id\n"
+            f"r1,ana@mail.com,{past},{past + timedelta(3)},concluded,{DOG_ID},{self.room_dog.id}\n"
+            f"r1,ana@mail.com,{past},{past + timedelta(3)},concluded,{CAT_ID},{self.room_cat.id}\n"
+            f"r2,ana@mail.com,{past},{past + timedelta(2)},concluded,{CAT_ID},{self.room_dog.id}\n"
+            f"r3,ana@mail.com,{future},{future + timedelta(2)},,{DOG_ID},{self.room_dog.id}\n",
+        )
+
+        output = self.run_import(users=users, pets=pets, reservations=reservations)
+
+        self.assertIn("rows/s", output)
+        self.assertEqual(2, User.objects.filter(email__in=["ana@mail.com", "bia@mail.com"]).count())
+        self.assertTrue(User.objects.get(email="ana@mail.com").check_password("1234"))
+        self.assertFalse(User.objects.get(email="bia@mail.com").has_usable_password())
+        self.assertEqual(2, Pet.objects.count())
+
+        history = Reservation.objects.get(checkin=past)
+        self.assertEqual("concluded", history.status)
+        self.assertEqual(2, history.reservation_pets.count())
+        booking = Reservation.objects.get(checkin=future)
+        self.assertEqual(1, booking.reservation_pets.count())
+        self.assertListEqual([], get_occupancy_drift())
+        self.assertTrue(RoomOccupancy.objects.filter(date=past).exists())
+
+        rejects = self.read_rejects()
+        self.assertEqual(5, len(rejects))
+        errors = {(reject["file"], reject["lines"][0]): reject["errors"] for reject in rejects}
+        self.assertIn("This email is already registered", errors[(users, 4)])
+        self.assertIn("Invalid JSON object", errors[(pets, 4)])
+        self.assertIn("Pet not compatible with the room", errors[(reservations, 4)])
+
+    def test_invalid_values_are_rejected_without_losing_the_batch(self):
+        users = self.write(
+            "users.jsonl",
+            "\n".join(
+                json.dumps(row)
+                for row in [
+                    {"email": 12345, "name": "Ana"},
+                    {"email": "bia@mail.com", "name": ["Bia"]},
+                    {"email": "caio@mail.com", "name": "Caio", "profile_img": "x" * 301},
+                    {"email": "dani@mail.com", "name": "Dani", "password": 1234},
+                ]
+            ),
+        )
+        pets = self.write(
+            "pets.jsonl",
+            "\n".join(
+                json.dumps(row)
+                for row in [
+                    {"user_email": "dani@mail.com", "name": "x" * 51, "type": "dog",
+                     "age": "2", "neutered": True, "vaccinated": True, "docile": True},
+                    {"user_email": "dani@mail.com", "name": "Rex", "type": "dog",
+                     "age": 2, "neutered": True, "vaccinated": True, "docile": True},
+                ]
+            ),
+        )
+        past = self.today - timedelta(30)
+        reservations = self.write(
+            "reservations.jsonl",
+            "\n".join(
+                json.dumps(row)
+                for row in [
+                    {"reservation": "r1", "user_email": {"email": "dani@mail.com"},
+                     "checkin": str(past), "checkout": str(past + timedelta(1)),
+                     "pet_id": DOG_ID, "room_type_id": self.room_dog.id},
+                    {"reservation": "r2", "user_email": "dani@mail.com",
+                     "checkin": "1900-01-01", "checkout": str(past),
+                     "pet_id": DOG_ID, "room_type_id": self.room_dog.id},
+                ]
+            ),
+        )
+
+        self.run_import(users=users, pets=pets, reservations=reservations)
+
+        self.assertListEqual(
+            ["dani@mail.com"], list(User.objects.values_list("email", flat=True))
+        )
+        self.assertTrue(User.objects.get(email="dani@mail.com").check_password("1234"))
+        self.assertEqual("2", Pet.objects.get(name="Rex").age)
+        self.assertFalse(Reservation.objects.exists())
+
+        errors = {
+            (reject["file"], reject["lines"][0]): reject["errors"]
+            for reject in self.read_rejects()
+        }
+        self.assertIn("Invalid email", errors[(users, 1)])
+        self.assertIn("name must be text", errors[(users, 2)])
+        self.assertIn("profile_img is too long", errors[(users, 3)])
+        self.assertIn("name is too long", errors[(pets, 1)])
+        self.assertIn("user_email must be text", errors[(reservations, 1)])
+        self.assertIn("Stay cannot be longer than 365 nights", errors[(reservations, 2)])
+
+    def test_values_refused_by_the_database_reject_only_their_record(self):
+        users = self.write(
+            "users.csv",
+            "name,email\nAna,ana@mail.com\nBia,bia@mail.com\n",
+        )
+        bulk_create = User.objects.bulk_create
+
+        def refuse_bia(users):
+            if any(user.email == "bia@mail.com" for user in users):
+                raise DataError("value too long for type character varying(11)")
+            return bulk_create(users)
+
+        with patch.object(User.objects, "bulk_create", side_effect=refuse_bia):
+            self.run_import(users=users)
+
+        self.assertListEqual(["ana@mail.com"], list(User.objects.values_list("email", flat=True)))
+        rejects = self.read_rejects()
+        self.assertEqual(1, len(rejects))
+        self.assertIn("value too long", rejects[0]["errors"][0])
+
+    def test_history_fills_the_rooms_without_overlaps(self):
+        owner = User.objects.create_user(email="ana@mail.com", password="1234", name="Ana")
+        dogs = Pet.objects.bulk_create(
+            [
+                Pet(name=f"Dog {index}", type="dog", age="1", neutered=True,
+                    vaccinated=True, docile=True, user=owner)
+                for index in range(12)
+            ]
+        )
+        checkin = self.today - timedelta(10)
+        lines = "".join(
+            f"ana@mail.com,{checkin},{checkin + timedelta(3)},{dog.id},{self.room_dog.id}\n"
+            for dog in dogs
+        )
+        reservations = self.write(
+            "reservations.csv", "user_email,checkin,checkout,pet_id,room_type_id\n" + lines
+        )
+
+        self.run_import(reservations=reservations)
+
+        stays = ReservationPet.objects.filter(checkin=checkin)
+        rooms_count = Room.objects.filter(room_type=self.room_dog).count()
+        self.assertEqual(min(12, rooms_count), stays.count())
+        self.assertEqual(stays.count(), stays.values("room_id").distinct().count())
+        self.assertListEqual([], get_occupancy_drift())
+
+    def test_history_is_added_to_the_ledger_batch_by_batch(self):
+        owner = User.objects.create_user(email="ana@mail.com", password="1234", name="Ana")
+        dogs = Pet.objects.bulk_create(
+            [
+                Pet(name=f"Dog {index}", type="dog", age="1", neutered=True,
+                    vaccinated=True, docile=True, user=owner)
+                for index in range(3)
+            ]
+        )
+        room_shared = RoomType.objects.get(title="Quarto Compartilhado")
+        shared_room = Room.objects.filter(room_type=room_shared).first()
+        # noite gravada por uma reserva da API em outro processo, durante a importação
+        booked = RoomOccupancy.objects.create(
+            room=shared_room, room_type=room_shared, date=self.today + timedelta(5), occupied=1
+        )
+        checkin = self.today - timedelta(10)
+        lines = "".join(
+            f"ana@mail.com,{checkin},{checkin + timedelta(2)},{dog.id},{room_shared.id}\n"
+            for dog in dogs
+        )
+        reservations = self.write(
+            "reservations.csv", "user_email,checkin,checkout,pet_id,room_type_id\n" + lines
+        )
+
+        self.run_import(reservations=reservations)
+
+        self.assertTrue(RoomOccupancy.objects.filter(id=booked.id, occupied=1).exists())
+        self.assertListEqual(
+            [3, 3],
+            list(
+                RoomOccupancy.objects.filter(room=shared_room, date__lt=self.today)
+                .order_by("date")
+                .values_list("occupied", flat=True)
+            ),
+        )
+
+    def test_history_rejects_pets_already_staying_elsewhere(self):
+        owner = User.objects.create_user(email="ana@mail.com", password="1234", name="Ana")
+        dog = Pet.objects.create(
+            name="Rex", type="dog", age="1", neutered=True, vaccinated=True, docile=True,
+            user=owner,
+        )
+        past = self.today - timedelta(30)
+        header = "reservation,user_email,checkin,checkout,status,pet_id,room_type_id\n"
+        first = self.write(
+            "first.csv",
+            header
+            + f"r1,ana@mail.com,{past},{past + timedelta(3)},concluded,{dog.id},{self.room_dog.id}\n"
+            + f"r2,ana@mail.com,{past + timedelta(1)},{past + timedelta(2)},concluded,{dog.id},{self.room_dog.id}\n",
+        )
+        self.run_import(reservations=first)
+        self.assertEqual(1, ReservationPet.objects.filter(pet=dog).count())
+
+        second = self.write(
+            "second.csv",
+            header
+            + f"r3,ana@mail.com,{past + timedelta(2)},{past + timedelta(4)},concluded,{dog.id},{self.room_dog.id}\n"
+            + f"r4,ana@mail.com,{past + timedelta(2)},{past + timedelta(4)},cancelled,{dog.id},{self.room_dog.id}\n"
+            + f"r5,ana@mail.com,{past + timedelta(3)},{past + timedelta(4)},concluded,{dog.id},{self.room_dog.id}\n",
+        )
+        self.run_import(reservations=second)
+
+        self.assertListEqual(
+            [(past, False), (past + timedelta(2), True), (past + timedelta(3), False)],
+            list(
+                ReservationPet.objects.filter(pet=dog)
+                .order_by("checkin")
+                .values_list("checkin", "is_cancelled")
+            ),
+        )
+        rejects = self.read_rejects()
+        self.assertEqual(1, len(rejects))
+        self.assertIn("Pet is already booked", rejects[0]["errors"])
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+from django.test import TestCase
+from rooms.models import Room, RoomType
+from rooms.aux_functions.engine import OccupancyEngine
+from reservations.models import ReservationPet
+from reservations.serializers import ReservationSerializer
+from tests.factories import create_user_with_token
+from tests.factories.create_pet_factories import create_multiple_pet_with_user
+
+
+class OccupancyEngineTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user, _ = create_user_with_token()
+        cls.dogs = create_multiple_pet_with_user(user=cls.user, pets_count=3, type="dog")
+        cls.room_dog = RoomType.objects.get(title="Quarto Privativo (cães)")
+        cls.room_shared = RoomType.objects.get(title="Quarto Compartilhado")
+
+        cls.checkin = datetime.now().date() + timedelta(10)
+        cls.checkout = cls.checkin + timedelta(2)
+        for dog, room_type in zip(cls.dogs, [cls.room_dog, cls.room_shared, cls.room_shared]):
+            serializer = ReservationSerializer(
+                data={
+                    "checkin": cls.checkin.strftime("%Y-%m-%d"),
+                    "checkout": cls.checkout.strftime("%Y-%m-%d"),
+                    "pet_rooms": [{"pet_id": str(dog.id), "room_type_id": room_type.id}],
+                }
+            )
+            serializer.is_valid(raise_exception=True)
+            serializer.save(user=cls.user)
+
+        cls.engine = OccupancyEngine.load(cls.checkin - timedelta(1), cls.checkout + timedelta(1))
+
+    def test_population_per_night(self):
+        population = self.engine.get_population(self.room_shared.id).tolist()
+        self.assertListEqual([0, 2, 2, 0], population)
+
+    def test_occupied_rooms_per_night(self):
+        occupied_rooms = self.engine.get_occupied_rooms(self.room_dog.id).tolist()
+        self.assertListEqual([0, 1, 1, 0], occupied_rooms)
+
+    def test_free_rooms(self):
+        all_rooms = list(
+            Room.objects.filter(room_type=self.room_dog).order_by("id").values_list("id", flat=True)
+        )
+        free_rooms = self.engine.get_free_rooms(self.room_dog.id, self.checkin, self.checkout)
+        self.assertListEqual(all_rooms[1:], free_rooms)
+
+        free_rooms = self.engine.get_free_rooms(self.room_dog.id, self.checkout, self.checkout + timedelta(1))
+        self.assertListEqual(all_rooms, free_rooms)
+
+    def test_blocked_dates(self):
+        self.room_shared.capacity = 2
+        blocked_dates = self.engine.get_blocked_dates(self.room_shared)
+        self.assertListEqual([self.checkin, self.checkin + timedelta(1)], blocked_dates)
+
+        blocked_dates = self.engine.get_blocked_dates(self.room_shared, checkin=self.checkin + timedelta(1))
+        self.assertListEqual([self.checkin + timedelta(1)], blocked_dates)
+
+    def test_from_stays_matches_ledger(self):
+        engine = OccupancyEngine.from_stays(
+            self.engine.start,
+            self.engine.end,
+            list(zip(self.engine.room_ids.tolist(), self.engine.room_type_ids.tolist())),
+            ReservationPet.objects.values_list(
+                "room_id", "reservation__checkin", "reservation__checkout"
+            ),
+        )
+        self.assertListEqual(self.engine.pets.tolist(), engine.pets.tolist())
+
+    def test_max_population(self):
+        self.assertEqual(2, self.engine.get_max_population(self.room_shared.id))
+        self.assertEqual(
+            0, self.engine.get_max_population(self.room_shared.id, checkin=self.checkout)
+        )
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from reservations.serializers import ReservationSerializer
+from reservations.aux_functions.pricing import get_revenue
+from rooms.models import RoomType
+from rooms.aux_functions.registry import room_type_registry
+from services.models import Service
+from tests.factories import create_user_with_token
+from tests.factories.create_pet_factories import create_multiple_pet_with_user
+
+
+class PricingTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user, _ = create_user_with_token()
+        cls.dogs = create_multiple_pet_with_user(user=cls.user, pets_count=2, type="dog")
+        cls.room_dog = RoomType.objects.get(title="Quarto Privativo (cães)")
+        cls.room_shared = RoomType.objects.get(title="Quarto Compartilhado")
+        cls.service = Service.objects.order_by("id").first()
+        cls.checkin = datetime.now().date() + timedelta(10)
+
+    def setUp(self):
+        cache.clear()
+        room_type_registry.invalidate()
+
+    def book(self, checkin, nights, status=None):
+        data = {
+            "checkin": checkin.strftime("%Y-%m-%d"),
+            "checkout": (checkin + timedelta(nights)).strftime("%Y-%m-%d"),
+            "pet_rooms": [
+                {"pet_id": str(self.dogs[0].id), "room_type_id": self.room_dog.id},
+                {"pet_id": str(self.dogs[1].id), "room_type_id": self.room_shared.id},
+            ],
+            "services": [{"service_id": self.service.id, "amount": 3}],
+        }
+        if status:
+            data["status"] = status
+        serializer = ReservationSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save(user=self.user)
+
+    def test_total_is_stored_with_the_booking_prices(self):
+        reservation = self.book(self.checkin, 3)
+
+        rooms_total = (self.room_dog.price + self.room_shared.price) * 3
+        services_total = self.service.price * 3
+        reservation.refresh_from_db()
+        self.assertEqual(rooms_total, reservation.rooms_total)
+        self.assertEqual(services_total, reservation.services_total)
+        self.assertEqual(rooms_total + services_total, reservation.total)
+        reservation_service = reservation.reservation_services.get()
+        self.assertEqual(self.service.price, reservation_service.unit_price)
+        self.assertEqual(services_total, reservation_service.price)
+        self.assertSetEqual(
+            {self.room_dog.price, self.room_shared.price},
+            set(reservation.reservation_pets.values_list("nightly_price", flat=True)),
+        )
+
+        # preços novos não mudam as reservas já feitas
+        RoomType.objects.filter(id=self.room_dog.id).update(price=Decimal("999.00"))
+        reservation.refresh_from_db()
+        self.assertEqual(rooms_total + services_total, reservation.total)
+
+    def test_revenue_skips_cancelled_reservations(self):
+        first = self.book(self.checkin, 2)
+        second = self.book(self.checkin + timedelta(5), 1)
+        self.book(self.checkin + timedelta(10), 1, status="cancelled")
+
+        revenue = get_revenue(self.checkin, self.checkin + timedelta(30))
+        self.assertEqual(first.total + second.total, revenue)
+        self.assertEqual(Decimal("0.00"), get_revenue(self.checkin - timedelta(5), self.checkin))
+
+    def test_prices_are_read_from_the_database(self):
+        room_type_registry.get_all()
+        # outro processo muda o preço: o registro deste processo ainda tem o antigo
+        RoomType.objects.filter(id=self.room_dog.id).update(price=Decimal("123.45"))
+
+        reservation = self.book(self.checkin, 2)
+        reservation_pet = reservation.reservation_pets.get(room_type_id=self.room_dog.id)
+        self.assertEqual(Decimal("123.45"), reservation_pet.nightly_price)
+        self.assertEqual(Decimal("246.90"), reservation_pet.price)
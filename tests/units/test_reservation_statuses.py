@@ -0,0 +1,89 @@
+from datetime import date
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from reservations.models import Reservation
+from reservations.aux_functions.statuses import (
+    advance_reservation_statuses,
+    get_last_status_run,
+)
+from tests.factories import create_normal_user_with_token
+
+
+class ReservationStatusesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user, _ = create_normal_user_with_token()
+        stays = {
+            "future": ("reserved", date(2023, 3, 1), date(2023, 3, 3)),
+            "starting": ("reserved", date(2023, 2, 1), date(2023, 2, 3)),
+            "ending": ("active", date(2023, 1, 30), date(2023, 2, 1)),
+            "past": ("reserved", date(2023, 1, 10), date(2023, 1, 12)),
+            "cancelled": ("cancelled", date(2023, 1, 10), date(2023, 1, 12)),
+        }
+        cls.reservations = {
+            name: Reservation.objects.create(
+                user=cls.user, status=status, checkin=checkin, checkout=checkout
+            )
+            for name, (status, checkin, checkout) in stays.items()
+        }
+
+    def get_statuses(self):
+        return {
+            name: Reservation.objects.get(id=reservation.id).status
+            for name, reservation in self.reservations.items()
+        }
+
+    def test_transitions(self):
+        run = advance_reservation_statuses(date(2023, 2, 1))
+        self.assertDictEqual(
+            {
+                "future": "reserved",
+                "starting": "active",
+                "ending": "concluded",
+                "past": "concluded",
+                "cancelled": "cancelled",
+            },
+            self.get_statuses(),
+        )
+        self.assertEqual((1, 2), (run.activated, run.concluded))
+
+    def test_idempotent_and_recorded(self):
+        self.assertIsNone(get_last_status_run())
+        advance_reservation_statuses(date(2023, 2, 1))
+        statuses = self.get_statuses()
+        updated_at = list(Reservation.objects.order_by("id").values_list("updated_at"))
+
+        run = advance_reservation_statuses(date(2023, 2, 1))
+        self.assertDictEqual(statuses, self.get_statuses())
+        self.assertListEqual(
+            updated_at, list(Reservation.objects.order_by("id").values_list("updated_at"))
+        )
+        self.assertEqual((0, 0), (run.activated, run.concluded))
+        self.assertEqual(date(2023, 2, 1), get_last_status_run().date)
+
+    def test_command(self):
+        output = StringIO()
+        call_command("advance_reservation_statuses", stdout=output)
+        self.assertIn("activated", output.getvalue())
+        self.assertIsNotNone(get_last_status_run())
+
+    def test_effective_status_without_writes(self):
+        today = date(2023, 2, 1)
+        effective = {
+            reservation.id: reservation.effective_status
+            for reservation in Reservation.objects.with_effective_status(today)
+        }
+        self.assertDictEqual(
+            {
+                "future": "reserved",
+                "starting": "active",
+                "ending": "concluded",
+                "past": "concluded",
+                "cancelled": "cancelled",
+            },
+            {name: effective[reservation.id] for name, reservation in self.reservations.items()},
+        )
+        for name, reservation in self.reservations.items():
+            self.assertEqual(effective[reservation.id], reservation.get_effective_status(today))
+        self.assertEqual("reserved", Reservation.objects.get(id=self.reservations["starting"].id).status)
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rooms.models import Room, RoomOccupancy, RoomType
+from rooms.aux_functions.availability import RoomUnavailable, allocate_rooms
+from rooms.aux_functions.cache import get_occupancy_engine
+from rooms.aux_functions.dates import get_dates_in_range
+
+
+class RoomAllocationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.room_dog = RoomType.objects.get(title="Quarto Privativo (cães)")
+        cls.room_cat = RoomType.objects.get(title="Quarto Privativo (gatos)")
+        cls.room_shared = RoomType.objects.get(title="Quarto Compartilhado")
+        cls.checkin = datetime.now().date() + timedelta(10)
+        cls.checkout = cls.checkin + timedelta(2)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pets_are_packed_by_capacity(self):
+        room_type_ids = [self.room_dog.id, self.room_cat.id, self.room_dog.id, self.room_dog.id]
+        rooms = allocate_rooms(self.checkin, self.checkout, room_type_ids)
+
+        dog_rooms = [room.id for room in rooms if room.room_type_id == self.room_dog.id]
+        self.assertEqual(3, len(dog_rooms))
+        self.assertEqual(dog_rooms[0], dog_rooms[1])
+        self.assertNotEqual(dog_rooms[1], dog_rooms[2])
+        self.assertEqual(self.room_cat.id, rooms[1].room_type_id)
+
+    def test_shared_room_capacity_counts_all_pets(self):
+        room_type_ids = [self.room_shared.id] * self.room_shared.capacity
+        rooms = allocate_rooms(self.checkin, self.checkout, room_type_ids)
+        self.assertEqual(1, len({room.id for room in rooms}))
+
+        with self.assertRaises(RoomUnavailable):
+            allocate_rooms(self.checkin, self.checkout, room_type_ids + [self.room_shared.id])
+
+    def test_not_enough_private_rooms(self):
+        amount_of_rooms = Room.objects.filter(room_type=self.room_dog).count()
+        room_type_ids = [self.room_dog.id] * (amount_of_rooms * self.room_dog.capacity + 1)
+        with self.assertRaises(RoomUnavailable):
+            allocate_rooms(self.checkin, self.checkout, room_type_ids)
+
+    def test_inexistent_room_type(self):
+        with self.assertRaises(Http404):
+            allocate_rooms(self.checkin, self.checkout, [self.room_dog.id, 99999])
+
+    def test_group_booking_costs_same_queries(self):
+        with CaptureQueriesContext(connection) as single_pet:
+            allocate_rooms(self.checkin, self.checkout, [self.room_dog.id, self.room_shared.id])
+
+        cache.clear()
+        room_type_ids = [self.room_dog.id] * 20 + [self.room_shared.id] * 20
+        with CaptureQueriesContext(connection) as group:
+            allocate_rooms(self.checkin, self.checkout, room_type_ids)
+
+        self.assertEqual(len(single_pet), len(group))
+
+    def fill_ledger(self, room_type, occupied):
+        # grava direto no ledger, sem signals: o cache deste processo fica desatualizado
+        # como o de um processo que não fez a reserva
+        RoomOccupancy.objects.bulk_create(
+            RoomOccupancy(room=room, room_type=room_type, date=night, occupied=occupied)
+            for room in Room.objects.filter(room_type=room_type)
+            for night in get_dates_in_range(self.checkin, self.checkout)
+        )
+
+    def test_allocation_reads_the_ledger_not_the_stale_cache(self):
+        get_occupancy_engine(self.checkin, self.checkout, [self.room_dog.id, self.room_shared.id])
+        self.fill_ledger(self.room_shared, self.room_shared.capacity)
+        self.fill_ledger(self.room_dog, 1)
+
+        with self.assertRaises(RoomUnavailable):
+            allocate_rooms(self.checkin, self.checkout, [self.room_shared.id])
+        with self.assertRaises(RoomUnavailable):
+            allocate_rooms(self.checkin, self.checkout, [self.room_dog.id])
+
+    def test_allocation_ignores_stays_released_in_other_processes(self):
+        self.fill_ledger(self.room_dog, 1)
+        get_occupancy_engine(self.checkin, self.checkout, [self.room_dog.id])
+        RoomOccupancy.objects.filter(room_type=self.room_dog).delete()
+
+        rooms = allocate_rooms(self.checkin, self.checkout, [self.room_dog.id])
+        self.assertEqual(self.room_dog.id, rooms[0].room_type_id)
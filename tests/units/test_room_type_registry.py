@@ -0,0 +1,66 @@
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import TestCase
+from rooms.models import RoomKindChoices, RoomType
+from rooms.aux_functions.registry import (
+    REGISTRY_TIMEOUT,
+    VERSION_KEY,
+    accepts_pet_type,
+    room_type_registry,
+)
+
+
+class RoomTypeRegistryTest(TestCase):
+    def setUp(self):
+        room_type_registry.invalidate()
+
+    def test_kinds_of_the_default_room_types(self):
+        kinds = {room_type.title: room_type.kind for room_type in room_type_registry.get_all()}
+        self.assertDictEqual(
+            {
+                "Quarto Compartilhado": RoomKindChoices.SHARED,
+                "Quarto Privativo (cães)": RoomKindChoices.DOGS,
+                "Quarto Privativo (gatos)": RoomKindChoices.CATS,
+            },
+            kinds,
+        )
+
+    def test_pet_compatibility(self):
+        shared = room_type_registry.get_shared()[0]
+        cats = RoomType.objects.get(kind=RoomKindChoices.CATS)
+        self.assertTrue(accepts_pet_type(shared, "dog"))
+        self.assertFalse(accepts_pet_type(shared, "cat"))
+        self.assertTrue(accepts_pet_type(cats, "cat"))
+        self.assertFalse(accepts_pet_type(cats, "dog"))
+
+    def test_loaded_once_and_invalidated_on_save(self):
+        with self.assertNumQueries(1):
+            room_type_registry.get_all()
+            room_type_registry.get(1)
+            room_type_registry.get_shared()
+
+        RoomType.objects.create(
+            title="Quarto Gigante", description="", image="", capacity=4, price=300
+        )
+        self.assertEqual(4, len(room_type_registry.get_all()))
+
+        RoomType.objects.get(title="Quarto Gigante").delete()
+        self.assertEqual(3, len(room_type_registry.get_all()))
+
+    def test_reloaded_when_another_process_changes_a_room_type(self):
+        room_type = room_type_registry.get_shared()[0]
+        # outro processo grava a mudança e só incrementa a versão compartilhada
+        RoomType.objects.filter(id=room_type.id).update(capacity=room_type.capacity + 5)
+        self.assertEqual(room_type.capacity, room_type_registry.get(room_type.id).capacity)
+
+        cache.incr(VERSION_KEY)
+        self.assertEqual(room_type.capacity + 5, room_type_registry.get(room_type.id).capacity)
+
+    def test_reloaded_after_the_timeout(self):
+        room_type = room_type_registry.get_shared()[0]
+        RoomType.objects.filter(id=room_type.id).update(price=999)
+        with patch(
+            "rooms.aux_functions.registry.monotonic",
+            return_value=room_type_registry._loaded_at + REGISTRY_TIMEOUT + 1,
+        ):
+            self.assertEqual(999, room_type_registry.get(room_type.id).price)
@@ -0,0 +1,35 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rooms.aux_functions.occupancy import get_expected_occupancy
+from reservations.models import ReservationPet
+from tests.factories import create_normal_user_with_token
+from tests.factories.reservation_factories import create_dog_reservation
+
+
+class StayRowsTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user, token = create_normal_user_with_token()
+        cls.access_token = str(token.access_token)
+        cls.reservation = create_dog_reservation(user=cls.user)
+
+    def test_stay_copies_the_reservation(self):
+        stay = ReservationPet.objects.select_related("room").get(reservation=self.reservation)
+        self.assertEqual(stay.room.room_type_id, stay.room_type_id)
+        self.assertEqual(self.reservation.checkin, stay.checkin)
+        self.assertEqual(self.reservation.checkout, stay.checkout)
+        self.assertFalse(stay.is_cancelled)
+
+    def test_cancelling_flags_the_stays(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token)
+        self.client.delete(f"/api/reservations/{self.reservation.id}/")
+        stay = ReservationPet.objects.get(reservation=self.reservation)
+        self.assertTrue(stay.is_cancelled)
+        self.assertDictEqual({}, get_expected_occupancy())
+
+    def test_occupancy_reads_a_single_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            get_expected_occupancy()
+        self.assertEqual(1, len(queries))
+        self.assertNotIn("JOIN", queries[0]["sql"])
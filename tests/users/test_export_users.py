@@ -0,0 +1,33 @@
+import csv
+import io
+from rest_framework.test import APITestCase
+from tests.factories import create_user_with_token, create_normal_user_with_token
+
+
+class UserExportView(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user_1_super, token_1 = create_user_with_token()
+        cls.access_token_1 = str(token_1.access_token)
+        cls.user_2_normal, token_2 = create_normal_user_with_token()
+        cls.access_token_2 = str(token_2.access_token)
+        cls.BASE_URL = "/api/users/export/"
+
+    def test_export_only_for_admin(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_2)
+        response = self.client.get(self.BASE_URL)
+        self.assertEqual(403, response.status_code)
+
+    def test_export_csv(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + self.access_token_1)
+        response = self.client.get(self.BASE_URL)
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("text/csv; charset=utf-8", response["Content-Type"])
+        self.assertListEqual(
+            [self.user_1_super.email, self.user_2_normal.email],
+            [row["email"] for row in rows],
+        )
+        self.assertNotIn("password", rows[0])
@@ -110,7 +110,7 @@ class UserListViewsTest(APITestCase):
             }
         ]
 
-        resulted_data = response.json()
+        resulted_data = response.json()["results"]
         msg = (
             "Verifique se os dados retornados do GET com permissão de adm "
             + f"em `{self.BASE_URL}` é {expected_data}"
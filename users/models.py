@@ -14,7 +14,11 @@ class User(AbstractBaseUser, PermissionsMixin):
     profile_img = models.CharField(max_length=300, null=True, blank=True)
     cpf = models.CharField(max_length=11, null=True, blank=True)
     password_reset_code = models.IntegerField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
 
     objects = UserManager()
 
     USERNAME_FIELD = "email"
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"], name="user_created_idx")]
@@ -5,6 +5,7 @@ from rest_framework_simplejwt import views as jwt_views
 
 urlpatterns = [
     path("users/", views.UserView.as_view()),
+    path("users/export/", views.UserExportView.as_view()),
     path("users/<uuid:pk>/", views.UserDetailView.as_view()),
     path("login/", jwt_views.TokenObtainPairView.as_view()),
     path("forgot/", views.ForgotView.as_view()),
@@ -8,6 +8,8 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from .models import User
 from .serializers import UserSerializer
 from .permissions import IsAccountOwner, IsAdm, IsAuthenticatedOrPost
+from _core.export import export_response, get_export_format
+from _core.pagination import CreatedAtCursorPagination
 import random
 from django.core.mail import send_mail
 from django.conf import settings
@@ -17,6 +19,7 @@ import ipdb
 class UserView(ListCreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = CreatedAtCursorPagination
 
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticatedOrPost]
@@ -33,19 +36,42 @@ class UserView(ListCreateAPIView):
     #     return [permission() for permission in self.permission_classes]
 
     # sobrescrevendo esse método para que, quando o request seja feito por um usuário não adm,
-    # seja retornado apenas o objeto (não um array) // 3 últimas linhas da função
+    # seja retornado apenas o objeto (não um array nem uma página)
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
 
+        if not request.user.is_adm:
+            serializer = self.get_serializer(queryset.first())
+            return Response(serializer.data)
+
         page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(queryset, many=True)
-        if request.user.is_adm:
-            return Response(serializer.data)
-        return Response(serializer.data[0])
+
+class UserExportView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdm]
+
+    columns = {
+        "id": "id",
+        "name": "name",
+        "email": "email",
+        "is_adm": "is_adm",
+        "cpf": "cpf",
+        "profile_img": "profile_img",
+        "created_at": "created_at",
+    }
+
+    def get(self, request):
+        export_format = get_export_format(request)
+        if export_format is None:
+            return Response(
+                {"message": "output must be one of csv, ndjson"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = User.objects.order_by("created_at", "id")
+        return export_response(queryset, self.columns, export_format, "users")
 
 
 class UserDetailView(RetrieveUpdateDestroyAPIView):